@@ -27,32 +27,69 @@ def encontrar_pontos(matriz):
                 pontos[valor] = (i, j)
     return pontos
 
-def calcular_distancia(p1, p2):
-    """Calcula a distância Manhattan entre dois pontos"""
-    diff_linha = p1[0] - p2[0]
-    diff_coluna = p1[1] - p2[1]
+def gerar_rotas(origem, pontos, rotulos):
+    """Percorre as rotas em profundidade sem montar a lista de permutações.
     
-    # Calcula valores absolutos sem usar a função abs()
-    if diff_linha < 0:
-        diff_linha = -diff_linha
-    if diff_coluna < 0:
-        diff_coluna = -diff_coluna
+    O custo do prefixo é acumulado ao descer, então prefixos em comum são calculados
+    uma única vez. Como a distância é simétrica, uma rota e a sua espelhada têm o mesmo
+    custo: só é gerada aquela cujo primeiro ponto vem antes do último em `rotulos`, e
+    os ramos que só levariam a espelhadas são podados assim que isso fica decidido.
+    Produz pares (custo, rota) na mesma ordem das permutações; a lista `rota` é
+    reaproveitada entre as iterações, então copie-a se precisar guardá-la.
+    """
+    n = len(rotulos)
+    # Distâncias Manhattan entre todos os pares, com a origem no índice 0
+    coordenadas = [origem] + [pontos[p] for p in rotulos]
+    distancias = []
+    for linha1, coluna1 in coordenadas:
+        linha_distancias = []
+        for linha2, coluna2 in coordenadas:
+            diff_linha = linha1 - linha2
+            diff_coluna = coluna1 - coluna2
+            # Calcula valores absolutos sem usar a função abs()
+            if diff_linha < 0:
+                diff_linha = -diff_linha
+            if diff_coluna < 0:
+                diff_coluna = -diff_coluna
+            linha_distancias.append(diff_linha + diff_coluna)
+        distancias.append(linha_distancias)
     
-    return diff_linha + diff_coluna
-
-def gerar_permutacoes(elementos):
-    """Gera todas as permutações possíveis de uma lista de elementos"""
-    if len(elementos) <= 1:
-        return [elementos]
+    usado = [False] * n
+    indices = []
+    rota = []
     
-    resultado = []
-    for i in range(len(elementos)):
-        elemento_atual = elementos[i]
-        elementos_restantes = elementos[:i] + elementos[i+1:]
-        for p in gerar_permutacoes(elementos_restantes):
-            resultado.append([elemento_atual] + p)
+    # A última parada precisa ter índice maior que a primeira; `maiores` conta as
+    # entregas livres nessa condição, e a última delas fica reservada para o fim
+    def descer(atual, custo, maiores):
+        if len(rota) == n:
+            yield custo + distancias[atual][0], rota
+            return
+        
+        ultimo = len(rota) == n - 1
+        for i in range(n):
+            if usado[i]:
+                continue
+            # Descarta os ramos que só levam a espelhadas de rotas já geradas
+            if not indices:
+                if n > 1 and i == n - 1:
+                    continue
+                maiores_proximo = n - 1 - i
+            else:
+                maior = i > indices[0]
+                if ultimo and not maior:
+                    continue
+                if not ultimo and maior and maiores == 1:
+                    continue
+                maiores_proximo = maiores - maior
+            usado[i] = True
+            indices.append(i)
+            rota.append(rotulos[i])
+            yield from descer(i + 1, custo + distancias[atual][i + 1], maiores_proximo)
+            rota.pop()
+            indices.pop()
+            usado[i] = False
     
-    return resultado
+    yield from descer(0, 0, 0)
 
 def encontrar_rota_otimizada():
     """Encontra a rota mais curta para as entregas do drone"""
@@ -68,25 +105,13 @@ def encontrar_rota_otimizada():
     if not pontos_entrega:
         return ""
     
-    permutacoes = gerar_permutacoes(pontos_entrega)
     menor_custo = None
     melhor_rota = None
     
-    for rota in permutacoes:
-        custo = 0
-        ponto_atual = origem
-        
-        for ponto in rota:
-            proximo_ponto = pontos[ponto]
-            custo += calcular_distancia(ponto_atual, proximo_ponto)
-            ponto_atual = proximo_ponto
-        
-        # Volta para a origem
-        custo += calcular_distancia(ponto_atual, origem)
-        
+    for custo, rota in gerar_rotas(origem, pontos, pontos_entrega):
         if menor_custo is None or custo < menor_custo:
             menor_custo = custo
-            melhor_rota = rota
+            melhor_rota = rota.copy()
     
     # Formata a saída como string
     if melhor_rota:
@@ -3,6 +3,8 @@ import os
 import zipfile
 import shutil
 import random
+# Rode a partir desta pasta com a pasta de cima (2-VA) no caminho de importação:
+#   PYTHONPATH=.. python batch_runner.py
 from ga_ds2 import FlyFoodGA, GASettings
 
 import matplotlib.pyplot as plt
@@ -46,7 +48,7 @@ def run_experiments():
                     n_points = delivery_multiplier * (rows + cols)
 
                     matrix, start, delivery_points = FlyFoodGA.generate_random_matrix(rows, cols, n_points)
-                    matrix_str = FlyFoodGA.matrix_to_string(matrix)
+                    matrix_str = matrix.para_texto()
 
                     for method in crossover_methods:
                         settings = GASettings(
@@ -1,9 +1,23 @@
 
+import os
 import random
-import matplotlib.pyplot as plt
 from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
 
+# As instâncias vêm do gerador da pasta de cima (2-VA), que sorteia só as células
+# ocupadas; rode a partir desta pasta com ela no caminho: PYTHONPATH=.. python batch_runner.py
+from entrada import MatrizEsparsa, ler_texto
+from instancias import gerar_instancia, gerar_rotulos
+
+
+def _pyplot():
+    # matplotlib só é carregado quando algo é desenhado, com backend não interativo
+    import matplotlib
+    if not os.environ.get('MPLBACKEND'):
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
 @dataclass
 class GASettings:
     pop_size: int = 150
@@ -23,55 +37,29 @@ class FlyFoodGA:
 
     @staticmethod
     def generate_labels(n: int) -> List[str]:
-        labels = []
-        for i in range(n):
-            label = ''
-            temp = i
-            while True:
-                label = chr(65 + temp % 26) + label
-                temp = temp // 26 - 1
-                if temp < 0:
-                    break
-            labels.append(label)
-        return labels
+        # Same spreadsheet-style labels as instancias.py, skipping 'R' (the start)
+        return gerar_rotulos(n)
 
     @staticmethod
-    def generate_random_matrix(rows: int, cols: int, num_points: int) -> Tuple[List[List[str]], Tuple[int, int], Dict[str, Tuple[int, int]]]:
-        matrix = [['0' for _ in range(cols)] for _ in range(rows)]
-        all_positions = [(r, c) for r in range(rows) for c in range(cols)]
-        start_pos = random.choice(all_positions)
-        matrix[start_pos[0]][start_pos[1]] = 'R'
-        all_positions.remove(start_pos)
-        delivery_labels = FlyFoodGA.generate_labels(num_points)
-        delivery_points = {}
-        for label in delivery_labels:
-            pos = random.choice(all_positions)
-            all_positions.remove(pos)
-            matrix[pos[0]][pos[1]] = label
-            delivery_points[label] = pos
-        return matrix, start_pos, delivery_points
+    def generate_random_matrix(rows: int, cols: int, num_points: int) -> Tuple[MatrizEsparsa, Tuple[int, int], Dict[str, Tuple[int, int]]]:
+        # Only the occupied cells are drawn and stored; the seed comes from `random`, so
+        # random.seed() still makes the instances reproducible
+        instance = gerar_instancia(rows, cols, num_points, semente=random.getrandbits(32))
+        delivery_points = dict(zip(instance.rotulos, map(tuple, instance.coordenadas[1:].tolist())))
+        return instance.para_matriz(), instance.origem, delivery_points
 
     @staticmethod
     def matrix_to_string(matrix: List[List[str]]) -> str:
         return f"{len(matrix)} {len(matrix[0])}\n" + "\n".join(" ".join(row) for row in matrix)
 
     @staticmethod
-    def parse_input(raw_input: str) -> Tuple[List[List[str]], Tuple[int, int], Dict[str, Tuple[int, int]]]:
-        lines = raw_input.strip().split("\n")
-        rows, cols = map(int, lines[0].split())
-        matrix = [line.split() for line in lines[1:]]
-        delivery_points = {}
-        start_pos = None
-        for r in range(rows):
-            for c in range(cols):
-                val = matrix[r][c]
-                if val == 'R':
-                    start_pos = (r, c)
-                elif val != '0':
-                    delivery_points[val] = (r, c)
-        if start_pos is None:
+    def parse_input(raw_input: str) -> Tuple[MatrizEsparsa, Tuple[int, int], Dict[str, Tuple[int, int]]]:
+        # Aceita a grade densa ou o texto esparso 'rótulo linha coluna' de MatrizEsparsa.para_texto
+        matrix = ler_texto(raw_input)
+        if 'R' not in matrix.pontos:
             raise ValueError("Ponto de partida 'R' não encontrado na matriz")
-        return matrix, start_pos, delivery_points
+        delivery_points = {p: pos for p, pos in matrix.pontos.items() if p != 'R'}
+        return matrix, matrix.pontos['R'], delivery_points
 
     def fitness(self, individual: List[str], start: Tuple[int, int], points: Dict[str, Tuple[int, int]]) -> float:
         total = 0
@@ -112,8 +100,9 @@ class FlyFoodGA:
         mapping = {p1[i]: p2[i] for i in range(a, b+1)}
         for i in list(range(0, a)) + list(range(b+1, size)):
             candidate = p2[i]
-            while candidate in child:
-                candidate = mapping.get(candidate, candidate)
+            # Só os genes do segmento colidem; segue o mapeamento até sair dele
+            while candidate in mapping:
+                candidate = mapping[candidate]
             child[i] = candidate
         return child
 
@@ -122,7 +111,7 @@ class FlyFoodGA:
             i, j = random.sample(range(len(individual)), 2)
             individual[i], individual[j] = individual[j], individual[i]
 
-    def run(self, matrix_txt: str) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], List[List[str]], List[int]]:
+    def run(self, matrix_txt: str) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], MatrizEsparsa, List[int]]:
         matrix, start, delivery_points = self.parse_input(matrix_txt)
         labels = list(delivery_points.keys())
         population = [random.sample(labels, len(labels)) for _ in range(self.settings.pop_size)]
@@ -151,14 +140,15 @@ class FlyFoodGA:
     @staticmethod
     def plot_route(route: List[str], start: Tuple[int, int], points: Dict[str, Tuple[int, int]], 
                    matrix: List[List[str]], title: str = 'Rota', save_path: Optional[str] = None) -> None:
+        plt = _pyplot()
         plt.figure(figsize=(8, 8))
         plt.title(title)
-        for r in range(len(matrix)):
-            for c in range(len(matrix[0])):
-                plt.scatter(c, -r, color='lightgray')
-                val = matrix[r][c]
-                if val != '0':
-                    plt.text(c, -r, val, fontsize=8, ha='center', va='center')
+        # A grade num único scatter; só as células ocupadas (R e as entregas) recebem
+        # rótulo, sem remontar as linhas densas
+        rows, cols = len(matrix), len(matrix[0]) if len(matrix) else 0
+        plt.scatter([c for _ in range(rows) for c in range(cols)], [-r for r in range(rows) for _ in range(cols)], color='lightgray')
+        for val, (r, c) in [('R', start)] + list(points.items()):
+            plt.text(c, -r, val, fontsize=8, ha='center', va='center')
         if points:
             xs = [coord[1] for coord in points.values()]
             ys = [-coord[0] for coord in points.values()]
@@ -189,6 +179,7 @@ class FlyFoodGA:
 
     @staticmethod
     def plot_progression(distances: List[int], save_path: Optional[str] = None) -> None:
+        plt = _pyplot()
         plt.figure(figsize=(10, 4))
         plt.plot(distances, label='Melhor distância')
         plt.title("Evolução da distância por geração")
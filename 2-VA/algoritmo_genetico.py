@@ -1,7 +1,21 @@
+import json
+import os
 import random
-import matplotlib.pyplot as plt
+import time
+import numpy as np
 from typing import List, Tuple, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from busca_local import busca_local
+from cache_rotas import CacheRotas
+from distancias import TabelaDistancias, construir_tabela
+from entrada import MatrizEsparsa, ler_texto
+from instancias import gerar_rotulos
+from insercao_mais_barata import rota_insercao_mais_barata
+from operadores_geneticos import crossover_order_lote, crossover_pmx_lote, selecao_torneio, selecao_roleta, mutar_com_delta
+from vizinho_mais_proximo import rota_mais_proxima_indices
+# Parte do tempo até o prazo que as sementes heurísticas da população inicial podem ocupar
+FRACAO_PRAZO_SEMENTES = 0.25
 
 @dataclass
 class ConfiguracoesAG:
@@ -9,12 +23,43 @@ class ConfiguracoesAG:
     numero_geracoes: int = 1000
     elitismo: bool = True
     taxa_mutacao: float = 0.2
-    metodo_selecao: str = 'torneio'
+    metodo_mutacao: str = 'troca'  # 'troca', 'insercao', 'inversao' ou 'or_opt'
+    metodo_selecao: str = 'torneio'  # 'torneio' ou 'roleta'
+    tamanho_torneio: int = 2
     metodo_crossover: str = 'order'  # 'order' ou 'pmx'
+    semente: Optional[int] = None
+    tamanho_cache: int = 0  # rotas guardadas no cache de avaliação (0 desativa)
+    busca_local: str = 'nenhuma'  # 'nenhuma', 'filhos', 'elite' ou 'final'
+    vizinhos_busca_local: int = 8
+    fracao_sementes: float = 0.0  # parte da população inicial criada por heurísticas construtivas
+    # Critérios de parada antecipada (None desativa); numero_geracoes continua sendo o teto
+    tempo_limite_ms: Optional[int] = None
+    paciencia: Optional[int] = None  # gerações seguidas sem melhora
+    custo_alvo: Optional[int] = None
+    # Checkpoint periódico em .npz para retomar execuções longas (None desativa)
+    arquivo_checkpoint: Optional[str] = None
+    intervalo_checkpoint: int = 100  # gerações entre gravações
+
+@dataclass
+class EstadoAG:
+    """Tudo o que a evolução precisa para continuar de onde parou"""
+    populacao: np.ndarray
+    pontuacoes: np.ndarray
+    melhor: np.ndarray
+    melhor_custo: int
+    geracao: int = 0
+    sem_melhora: int = 0
+    melhores_distancias: List[int] = field(default_factory=list)
 
 class FlyFoodAG:
     def __init__(self, configuracoes: Optional[ConfiguracoesAG] = None):
         self.configuracoes = configuracoes if configuracoes else ConfiguracoesAG()
+        self.rng = np.random.default_rng(self.configuracoes.semente)
+        self.cache: Optional[CacheRotas] = None
+        self.criterio_parada: Optional[str] = None
+        self.prazo: Optional[float] = None  # instante (time.perf_counter()) em que a execução atual deve parar
+        self._tabela: Optional[TabelaDistancias] = None
+        self._chave_tabela = None
 
     @staticmethod
     def manhattan(p1: Tuple[int, int], p2: Tuple[int, int]) -> int:
@@ -22,72 +67,85 @@ class FlyFoodAG:
 
     @staticmethod
     def gerar_rotulos(n: int) -> List[str]:
-        rotulos = []
-        for i in range(n):
-            r = ''
-            temp = i
-            while True:
-                r = chr(65 + temp % 26) + r
-                temp = temp // 26 - 1
-                if temp < 0:
-                    break
-            rotulos.append(r)
-        return rotulos
+        return gerar_rotulos(n)
 
     @staticmethod
     def gerar_matriz_aleatoria(linhas: int, colunas: int, num_pontos: int) -> Tuple[List[List[str]], Tuple[int, int], Dict[str, Tuple[int, int]]]:
-        matriz = [['0' for _ in range(colunas)] for _ in range(linhas)]
-        todas_posicoes = [(r, c) for r in range(linhas) for c in range(colunas)]
-        posicao_inicio = random.choice(todas_posicoes)
-        matriz[posicao_inicio[0]][posicao_inicio[1]] = 'R'
-        todas_posicoes.remove(posicao_inicio)
-        rotulos_entregas = FlyFoodAG.gerar_rotulos(num_pontos)
-        pontos_entregas = {}
-        for rotulo in rotulos_entregas:
-            pos = random.choice(todas_posicoes)
-            todas_posicoes.remove(pos)
-            matriz[pos[0]][pos[1]] = rotulo
-            pontos_entregas[rotulo] = pos
+        # Sorteia só as células ocupadas (random.sample sobre um range não monta a lista);
+        # a matriz devolvida é esparsa, mas indexável como uma lista de listas
+        celulas = random.sample(range(linhas * colunas), num_pontos + 1)
+        posicao_inicio = divmod(celulas[0], colunas)
+        pontos_entregas = {rotulo: divmod(celula, colunas) for rotulo, celula in zip(gerar_rotulos(num_pontos), celulas[1:])}
+        matriz = MatrizEsparsa(linhas, colunas, {'R': posicao_inicio, **pontos_entregas})
         return matriz, posicao_inicio, pontos_entregas
 
     @staticmethod
     def matriz_para_texto(matriz: List[List[str]]) -> str:
+        if isinstance(matriz, MatrizEsparsa):
+            return matriz.para_texto()
         return f"{len(matriz)} {len(matriz[0])}\n" + "\n".join(" ".join(linha) for linha in matriz)
 
     @staticmethod
     def ler_matriz_texto(entrada_texto: str) -> Tuple[List[List[str]], Tuple[int, int], Dict[str, Tuple[int, int]]]:
-        linhas = entrada_texto.strip().split("\n")
-        l, c = map(int, linhas[0].split())
-        matriz = [linha.split() for linha in linhas[1:]]
-        pontos_entregas = {}
-        posicao_inicio = None
-        for i in range(l):
-            for j in range(c):
-                valor = matriz[i][j]
-                if valor == 'R':
-                    posicao_inicio = (i, j)
-                elif valor != '0':
-                    pontos_entregas[valor] = (i, j)
+        # Aceita a matriz densa ou o formato esparso; a matriz devolvida é uma MatrizEsparsa
+        matriz = ler_texto(entrada_texto)
+        posicao_inicio = matriz.pontos.get('R')
+        pontos_entregas = {p: posicao for p, posicao in matriz.pontos.items() if p != 'R'}
         if posicao_inicio is None:
             raise ValueError("Ponto de partida 'R' não encontrado na matriz")
         return matriz, posicao_inicio, pontos_entregas
 
+    def tabela_distancias(self, inicio: Tuple[int, int], pontos: Dict[str, Tuple[int, int]]) -> TabelaDistancias:
+        # Reaproveita a matriz de distâncias enquanto a instância não mudar
+        chave = (inicio, tuple(pontos.items()))
+        if self._chave_tabela != chave:
+            self._tabela = construir_tabela(inicio, pontos)
+            self._chave_tabela = chave
+        return self._tabela
+
     def avaliacao(self, individuo: List[str], inicio: Tuple[int, int], pontos: Dict[str, Tuple[int, int]]) -> float:
-        custo_total = 0
-        atual = inicio
-        for p in individuo:
-            custo_total += self.manhattan(atual, pontos[p])
-            atual = pontos[p]
-        custo_total += self.manhattan(atual, inicio)
-        return -custo_total
+        tabela = self.tabela_distancias(inicio, pontos)
+        return self.avaliacao_indices(tabela.para_indices(individuo), tabela)
+
+    @staticmethod
+    def avaliacao_indices(individuo: List[int], tabela: TabelaDistancias) -> float:
+        return -tabela.custo(individuo)
+
+    @staticmethod
+    def avaliacao_populacao(populacao: np.ndarray, tabela: TabelaDistancias) -> np.ndarray:
+        # Avalia a população (P, n) inteira de uma vez, incluindo a saída e a volta para R
+        return -tabela.custos(populacao)
+
+    def avaliacao_com_cache(self, populacao: np.ndarray, tabela: TabelaDistancias) -> np.ndarray:
+        # Consulta o cache e avalia em lote apenas as rotas que ainda não estão nele
+        if self.cache is None:
+            return self.avaliacao_populacao(populacao, tabela)
+        chaves = [self.cache.chave(rota) for rota in populacao]
+        pontuacoes = np.empty(len(populacao), dtype=np.int64)
+        faltantes = []
+        for k, chave in enumerate(chaves):
+            valor = self.cache.obter(chave)
+            if valor is None:
+                faltantes.append(k)
+            else:
+                pontuacoes[k] = valor
+        if faltantes:
+            novas = self.avaliacao_populacao(populacao[faltantes], tabela)
+            pontuacoes[faltantes] = novas
+            for k, valor in zip(faltantes, novas.tolist()):
+                self.cache.guardar(chaves[k], valor)
+        return pontuacoes
 
     def selecao(self, populacao: List[List[str]], pontuacoes: List[float]) -> List[List[str]]:
-        selecionados = []
-        for _ in range(len(populacao)):
-            concorrentes = random.sample(list(zip(populacao, pontuacoes)), 2)
-            vencedor = max(concorrentes, key=lambda x: x[1])[0]
-            selecionados.append(vencedor.copy())
-        return selecionados
+        indices = self.selecao_indices(np.asarray(pontuacoes), len(populacao))
+        return [list(populacao[i]) for i in indices]
+
+    def selecao_indices(self, pontuacoes: np.ndarray, quantidade: int) -> np.ndarray:
+        if self.configuracoes.metodo_selecao == 'torneio':
+            return selecao_torneio(pontuacoes, quantidade, self.configuracoes.tamanho_torneio, self.rng)
+        if self.configuracoes.metodo_selecao == 'roleta':
+            return selecao_roleta(pontuacoes, quantidade, self.rng)
+        raise ValueError(f"Método de seleção desconhecido: {self.configuracoes.metodo_selecao}")
 
     def crossover_order(self, pai1: List[str], pai2: List[str]) -> List[str]:
         tamanho = len(pai1)
@@ -111,8 +169,9 @@ class FlyFoodAG:
         mapeamento = {pai1[i]: pai2[i] for i in range(a, b+1)}
         for i in list(range(0, a)) + list(range(b+1, tamanho)):
             candidato = pai2[i]
-            while candidato in filho:
-                candidato = mapeamento.get(candidato, candidato)
+            # Só os genes do segmento colidem; segue o mapeamento até sair dele
+            while candidato in mapeamento:
+                candidato = mapeamento[candidato]
             filho[i] = candidato
         return filho
 
@@ -121,94 +180,212 @@ class FlyFoodAG:
             i, j = random.sample(range(len(individuo)), 2)
             individuo[i], individuo[j] = individuo[j], individuo[i]
 
-    def executar(self, matriz_txt: str) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], List[List[str]], List[int]]:
-        matriz, inicio, pontos_entregas = self.ler_matriz_texto(matriz_txt)
-        rotulos = list(pontos_entregas.keys())
-        populacao = [random.sample(rotulos, len(rotulos)) for _ in range(self.configuracoes.tamanho_populacao)]
-        melhores_distancias = []
-
-        for _ in range(self.configuracoes.numero_geracoes):
-            pontuacoes = [self.avaliacao(ind, inicio, pontos_entregas) for ind in populacao]
-            nova_geracao = []
-
-            if self.configuracoes.elitismo:
-                melhor = max(zip(pontuacoes, populacao), key=lambda x: x[0])[1]
-                nova_geracao.append(melhor.copy())
-
-            selecionados = self.selecao(populacao, pontuacoes)
+    def melhorar(self, rota: np.ndarray, tabela: TabelaDistancias, prazo: Optional[float] = None) -> int:
+        # Busca local 2-opt/Or-opt no lugar, interrompida no prazo; devolve a variação da pontuação (>= 0)
+        nova, delta = busca_local(rota, tabela.matriz, tabela.vizinhos(self.configuracoes.vizinhos_busca_local), prazo)
+        rota[:] = nova
+        return -delta
+
+    def sementes_heuristicas(self, tabela: TabelaDistancias, quantidade: int, prazo: Optional[float] = None) -> List[np.ndarray]:
+        # Vizinho mais próximo e inserção mais barata, seguidos de variações gulosas
+        # aleatorizadas: partida de uma entrega sorteada ou escolha entre os 3 mais próximos.
+        # Com prazo, as sementes só ocupam FRACAO_PRAZO_SEMENTES do tempo restante; as
+        # que não couberem são deixadas para a parte aleatória da população
+        n = len(tabela.rotulos)
+        limite = None
+        if prazo is not None:
+            agora = time.perf_counter()
+            limite = agora + max(prazo - agora, 0.0) * FRACAO_PRAZO_SEMENTES
+
+        def cabe(estimativa: float) -> bool:
+            return limite is None or time.perf_counter() + estimativa <= limite
+
+        sementes = []
+        duracao = 0.0
+        if quantidade > 0:
+            inicio = time.perf_counter()
+            sementes.append(rota_mais_proxima_indices(tabela.matriz))
+            duracao = time.perf_counter() - inicio
+        # A inserção mais barata custa até cerca de n vezes o vizinho mais próximo: cada
+        # passo compara todas as arestas do ciclo com todos os pontos restantes
+        if quantidade > 1 and cabe(n * duracao):
+            rota = rota_insercao_mais_barata(tabela.matriz, limite)
+            if rota is not None:
+                sementes.append(rota)
+        while len(sementes) < quantidade and cabe(duracao):
+            inicio = time.perf_counter()
+            if len(sementes) % 2 == 0:
+                sementes.append(rota_mais_proxima_indices(tabela.matriz, primeiro=int(self.rng.integers(1, n + 1))))
+            else:
+                sementes.append(rota_mais_proxima_indices(tabela.matriz, self.rng, candidatos=3))
+            duracao = time.perf_counter() - inicio
+        return [np.array(s, dtype=np.int32) for s in sementes]
+
+    def populacao_inicial(self, tabela: TabelaDistancias, prazo: Optional[float] = None) -> np.ndarray:
+        # Os indivíduos são rotas de índices da tabela; os rótulos só voltam no final
+        indices = np.arange(1, len(tabela.rotulos) + 1, dtype=np.int32)
+        tamanho = self.configuracoes.tamanho_populacao
+        quantidade_sementes = min(tamanho, round(self.configuracoes.fracao_sementes * tamanho)) if len(indices) else 0
+        individuos = self.sementes_heuristicas(tabela, quantidade_sementes, prazo)
+        individuos += [self.rng.permutation(indices) for _ in range(tamanho - len(individuos))]
+        return np.array(individuos, dtype=np.int32).reshape(tamanho, len(indices))
+
+    def proxima_geracao(self, populacao: np.ndarray, pontuacoes: np.ndarray, tabela: TabelaDistancias, prazo: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        tamanho = len(populacao)
+        elite = [int(np.argmax(pontuacoes))] if self.configuracoes.elitismo else []
+        if elite and self.configuracoes.busca_local == 'elite':
+            pontuacoes[elite[0]] += self.melhorar(populacao[elite[0]], tabela, prazo)
+        selecionados = self.selecao_indices(pontuacoes, tamanho)
+
+        # Sorteia pares de vagas distintas entre os selecionados e gera todos os filhos de uma vez
+        quantidade = tamanho - len(elite)
+        vaga1 = self.rng.integers(0, tamanho, quantidade)
+        vaga2 = self.rng.integers(0, tamanho - 1, quantidade)
+        vaga2 += vaga2 >= vaga1
+        pais1, pais2 = selecionados[vaga1], selecionados[vaga2]
+        if self.configuracoes.metodo_crossover == 'pmx':
+            filhos = crossover_pmx_lote(populacao, pais1, pais2, self.rng)
+        else:
+            filhos = crossover_order_lote(populacao, pais1, pais2, self.rng)
+        pontuacoes_filhos = self.avaliacao_com_cache(filhos, tabela)
+
+        # A mutação atualiza a pontuação do filho só pelas arestas que mudaram
+        mutantes = np.nonzero(self.rng.random(quantidade) < self.configuracoes.taxa_mutacao)[0]
+        for k in mutantes:
+            pontuacoes_filhos[k] -= mutar_com_delta(filhos[k], tabela.matriz, self.configuracoes.metodo_mutacao, self.rng)
+            if self.cache is not None:
+                self.cache.guardar(self.cache.chave(filhos[k]), int(pontuacoes_filhos[k]))
+
+        if self.configuracoes.busca_local == 'filhos':
+            for k in range(quantidade):
+                # Passado o prazo, os filhos restantes seguem sem busca local
+                if prazo is not None and time.perf_counter() >= prazo:
+                    break
+                pontuacoes_filhos[k] += self.melhorar(filhos[k], tabela, prazo)
+
+        return np.vstack([populacao[elite], filhos]), np.concatenate([pontuacoes[elite], pontuacoes_filhos])
+
+    def parar(self, geracao: int, custo: int, sem_melhora: int, prazo: Optional[float]) -> Optional[str]:
+        # Devolve o motivo da parada, ou None para continuar evoluindo
+        configuracoes = self.configuracoes
+        if configuracoes.custo_alvo is not None and custo <= configuracoes.custo_alvo:
+            return 'alvo'
+        if configuracoes.paciencia is not None and sem_melhora >= configuracoes.paciencia:
+            return 'paciencia'
+        if prazo is not None and time.perf_counter() >= prazo:
+            return 'tempo'
+        if geracao >= configuracoes.numero_geracoes:
+            return 'geracoes'
+        return None
+
+    def salvar_checkpoint(self, caminho: str, estado: EstadoAG, tabela: TabelaDistancias) -> None:
+        # Grava num arquivo temporário e renomeia, para nunca deixar um checkpoint pela metade
+        temporario = caminho + '.tmp'
+        with open(temporario, 'wb') as arquivo:
+            np.savez(
+                arquivo,
+                rotulos=np.array(tabela.rotulos),
+                populacao=estado.populacao,
+                pontuacoes=estado.pontuacoes,
+                melhor=estado.melhor,
+                melhor_custo=estado.melhor_custo,
+                geracao=estado.geracao,
+                sem_melhora=estado.sem_melhora,
+                melhores_distancias=np.array(estado.melhores_distancias, dtype=np.int64),
+                estado_rng=json.dumps(self.rng.bit_generator.state),
+            )
+        os.replace(temporario, caminho)
+
+    def carregar_checkpoint(self, caminho: str, tabela: TabelaDistancias) -> EstadoAG:
+        with np.load(caminho) as dados:
+            if dados['rotulos'].tolist() != tabela.rotulos:
+                raise ValueError(f"O checkpoint {caminho} é de outra matriz de entregas")
+            self.rng.bit_generator.state = json.loads(str(dados['estado_rng']))
+            return EstadoAG(
+                populacao=dados['populacao'],
+                pontuacoes=dados['pontuacoes'],
+                melhor=dados['melhor'],
+                melhor_custo=int(dados['melhor_custo']),
+                geracao=int(dados['geracao']),
+                sem_melhora=int(dados['sem_melhora']),
+                melhores_distancias=dados['melhores_distancias'].tolist(),
+            )
+
+    def evoluir(self, estado: EstadoAG, tabela: TabelaDistancias, prazo: Optional[float] = None) -> EstadoAG:
+        configuracoes = self.configuracoes
+        # A duração da última geração estima a da próxima: ela só começa se couber no prazo
+        duracao = 0.0
+        while True:
+            prazo_inicio = prazo - duracao if prazo is not None else None
+            self.criterio_parada = self.parar(estado.geracao, estado.melhor_custo, estado.sem_melhora, prazo_inicio)
+            if self.criterio_parada:
+                break
+            inicio = time.perf_counter()
+            estado.melhores_distancias.append(-int(estado.pontuacoes.max()))
+            estado.populacao, estado.pontuacoes = self.proxima_geracao(estado.populacao, estado.pontuacoes, tabela, prazo)
+            estado.geracao += 1
+            duracao = time.perf_counter() - inicio
+            # Guarda a melhor rota já vista, que é devolvida seja qual for o motivo da parada
+            if -int(estado.pontuacoes.max()) < estado.melhor_custo:
+                estado.melhor = estado.populacao[int(np.argmax(estado.pontuacoes))].copy()
+                estado.melhor_custo = -int(estado.pontuacoes.max())
+                estado.sem_melhora = 0
+            else:
+                estado.sem_melhora += 1
+            if configuracoes.arquivo_checkpoint and estado.geracao % configuracoes.intervalo_checkpoint == 0:
+                self.salvar_checkpoint(configuracoes.arquivo_checkpoint, estado, tabela)
+
+        # O estado final também é gravado, para que uma parada por tempo possa ser estendida
+        if configuracoes.arquivo_checkpoint:
+            self.salvar_checkpoint(configuracoes.arquivo_checkpoint, estado, tabela)
+        return estado
 
-            for _ in range(len(populacao) - len(nova_geracao)):
-                pai1, pai2 = random.sample(selecionados, 2)
-                if self.configuracoes.metodo_crossover == 'pmx':
-                    filho = self.crossover_pmx(pai1, pai2)
-                else:
-                    filho = self.crossover_order(pai1, pai2)
-                self.mutar(filho)
-                nova_geracao.append(filho)
+    def executar(self, matriz_txt: str) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], List[List[str]], List[int]]:
+        return self._executar(matriz_txt, None)
 
-            populacao = nova_geracao
-            melhor_pontuacao = max(pontuacoes)
-            melhores_distancias.append(-melhor_pontuacao)
+    def retomar(self, matriz_txt: str, caminho: str) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], List[List[str]], List[int]]:
+        """Continua uma execução a partir do checkpoint em `caminho`.
 
-        melhor = max(populacao, key=lambda ind: self.avaliacao(ind, inicio, pontos_entregas))
-        return melhor, inicio, pontos_entregas, matriz, melhores_distancias
+        População, pontuações, estado do gerador aleatório, contador de gerações e
+        histórico são restaurados, então com as mesmas configurações o resultado é
+        idêntico ao de uma execução sem interrupção.
+        """
+        return self._executar(matriz_txt, caminho)
 
-    @staticmethod
-    def plotar_rota(rota: List[str], inicio: Tuple[int, int], pontos: Dict[str, Tuple[int, int]], matriz: List[List[str]], titulo: str = 'Rota', salvar_em: Optional[str] = None) -> None:
-        plt.figure(figsize=(8, 8))
-        plt.title(titulo)
-
-        for r in range(len(matriz)):
-            for c in range(len(matriz[0])):
-                plt.scatter(c, -r, color='lightgray')
-                valor = matriz[r][c]
-                if valor != '0':
-                    plt.text(c, -r, valor, fontsize=8, ha='center', va='center')
-
-        if pontos:
-            xs = [coord[1] for coord in pontos.values()]
-            ys = [-coord[0] for coord in pontos.values()]
-            plt.scatter(xs, ys, c='orange', s=60, marker='o', label='Entregas')
-
-        caminho = [inicio] + [pontos[p] for p in rota] + [inicio]
-        for i in range(len(caminho) - 1):
-            p0 = caminho[i]
-            p1 = caminho[i + 1]
-            x0, y0 = p0[1], -p0[0]
-            x1, y1 = p1[1], -p1[0]
-            inter_x, inter_y = x1, y0
-            plt.plot([x0, inter_x], [y0, inter_y], 'b-')
-            plt.plot([inter_x, x1], [inter_y, y1], 'b-')
-            dist = abs(p0[0] - p1[0]) + abs(p0[1] - p1[1])
-            xm = (x0 + inter_x + x1) / 3
-            ym = (y0 + inter_y + y1) / 3
-            plt.text(xm, ym, f"{dist}", color='purple', fontsize=8, ha='center', va='center', bbox=dict(facecolor='white', alpha=0.6, edgecolor='none', boxstyle='round,pad=0.2'))
-
-        plt.scatter(inicio[1], -inicio[0], c='red', label='Início (R)')
-        plt.legend()
-        plt.grid(True)
-        plt.axis('equal')
-        if salvar_em:
-            plt.savefig(salvar_em)
+    def _executar(self, matriz_txt: str, checkpoint: Optional[str]) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], List[List[str]], List[int]]:
+        # O orçamento cobre a execução inteira: leitura, tabela e população inicial também
+        tempo_limite = self.configuracoes.tempo_limite_ms
+        self.prazo = time.perf_counter() + tempo_limite / 1000 if tempo_limite is not None else None
+        matriz, inicio, pontos_entregas = self.ler_matriz_texto(matriz_txt)
+        tabela = self.tabela_distancias(inicio, pontos_entregas)
+        self.cache = CacheRotas(self.configuracoes.tamanho_cache) if self.configuracoes.tamanho_cache > 0 else None
+        if checkpoint:
+            estado = self.carregar_checkpoint(checkpoint, tabela)
         else:
-            plt.show()
-        plt.close()
+            populacao = self.populacao_inicial(tabela, self.prazo)
+            pontuacoes = self.avaliacao_populacao(populacao, tabela)
+            k = int(np.argmax(pontuacoes))
+            estado = EstadoAG(populacao, pontuacoes, populacao[k].copy(), -int(pontuacoes[k]))
+        estado = self.evoluir(estado, tabela, self.prazo)
+
+        melhor = estado.melhor
+        # Sem tempo sobrando, a busca local final é pulada; com tempo, ela para no prazo
+        if self.configuracoes.busca_local == 'final' and self.criterio_parada != 'tempo':
+            melhor = melhor.copy()
+            self.melhorar(melhor, tabela, self.prazo)
+        return tabela.para_rotulos(melhor.tolist()), inicio, pontos_entregas, matriz, list(estado.melhores_distancias)
+
+    # Os gráficos moram em visualizacao.py; estes atalhos mantêm a interface antiga e só
+    # importam o matplotlib quando chamados
+    @staticmethod
+    def plotar_rota(rota: List[str], inicio: Tuple[int, int], pontos: Dict[str, Tuple[int, int]], matriz: List[List[str]], titulo: str = 'Rota', salvar_em: Optional[str] = None) -> Optional[str]:
+        from visualizacao import plotar_rota
+        return plotar_rota(rota, inicio, pontos, matriz, titulo, salvar_em)
 
     @staticmethod
-    def plotar_evolucao(distancias: List[int], salvar_em: Optional[str] = None) -> None:
-        plt.figure(figsize=(10, 4))
-        plt.plot(distancias, label='Melhor distância')
-        plt.title("Evolução da distância por geração")
-        plt.xlabel("Geração")
-        plt.ylabel("Distância")
-        plt.grid(True)
-        plt.legend()
-        plt.tight_layout()
-        if salvar_em:
-            plt.savefig(salvar_em)
-        else:
-            plt.show()
-        plt.close()
+    def plotar_evolucao(distancias: List[int], salvar_em: Optional[str] = None) -> Optional[str]:
+        from visualizacao import plotar_evolucao
+        return plotar_evolucao(distancias, salvar_em)
 
 if __name__ == "__main__":
     print("Cole sua matriz: ")
@@ -233,5 +410,8 @@ if __name__ == "__main__":
     print("\n✅ Algoritmo Genético")
     print('Melhor rota encontrada:', ' '.join(melhor))
 
-    FlyFoodAG.plotar_rota(melhor, inicio, pontos_entregas, matriz)
-    FlyFoodAG.plotar_evolucao(distancias)
\ No newline at end of file
+    # Importado só aqui: o núcleo do AG não depende do matplotlib
+    from visualizacao import plotar_rota, plotar_evolucao
+    for arquivo in (plotar_rota(melhor, inicio, pontos_entregas, matriz), plotar_evolucao(distancias)):
+        if arquivo:
+            print('Gráfico salvo em', arquivo)
\ No newline at end of file
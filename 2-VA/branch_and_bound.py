@@ -0,0 +1,98 @@
+from typing import Dict, List, Tuple
+
+from distancias import construir_tabela
+from forca_bruta import ler_matriz, encontrar_pontos
+from vizinho_mais_proximo import encontrar_rota_mais_proxima
+
+
+def arvore_geradora_minima(distancias: List[List[int]], vertices: List[int]) -> int:
+    """Custo da árvore geradora mínima (Prim) sobre os vértices informados"""
+    if len(vertices) <= 1:
+        return 0
+    primeiro = distancias[vertices[0]]
+    menor_ligacao = {v: primeiro[v] for v in vertices[1:]}
+    total = 0
+    while menor_ligacao:
+        escolhido = min(menor_ligacao, key=menor_ligacao.get)
+        total += menor_ligacao.pop(escolhido)
+        linha = distancias[escolhido]
+        for v in menor_ligacao:
+            if linha[v] < menor_ligacao[v]:
+                menor_ligacao[v] = linha[v]
+    return total
+
+
+def resolver_branch_and_bound(posicoes: Dict[str, Tuple[int, int]]) -> Tuple[List[str], int, int, int]:
+    """Busca exata em profundidade com poda por limite inferior.
+
+    O restante de uma rota parcial sai do ponto atual, percorre todos os pontos não
+    visitados e volta para R, então custa pelo menos a árvore geradora mínima dos não
+    visitados mais a menor ligação de cada ponta. Retorna a rota, o custo, os nós
+    explorados e os nós podados.
+    """
+    origem = posicoes['R']
+    tabela = construir_tabela(origem, posicoes)
+    n = len(tabela.rotulos)
+    distancias = tabela.matriz.tolist()
+
+    rota_inicial = encontrar_rota_mais_proxima(posicoes, origem)
+    melhor_rota = [tabela.indices[p] for p in rota_inicial]
+    melhor_custo = tabela.custo(melhor_rota)
+    explorados = 0
+    podados = 0
+
+    # O bit v de `restantes` representa a entrega de índice v + 1 na tabela. A árvore
+    # mínima só depende do conjunto restante, e o menor custo já visto para
+    # (conjunto restante, ponto atual) permite descartar prefixos dominados
+    arvores: Dict[int, int] = {}
+    dominancia: Dict[Tuple[int, int], int] = {}
+
+    def buscar(rota: List[int], atual: int, custo: int, restantes: int) -> None:
+        nonlocal melhor_rota, melhor_custo, explorados, podados
+        explorados += 1
+
+        if not restantes:
+            custo_total = custo + distancias[atual][0]
+            if custo_total < melhor_custo:
+                melhor_custo = custo_total
+                melhor_rota = rota.copy()
+            return
+
+        estado = (restantes, atual)
+        if dominancia.get(estado, melhor_custo) <= custo:
+            podados += 1
+            return
+        dominancia[estado] = custo
+
+        vertices = [v + 1 for v in range(n) if (restantes >> v) & 1]
+        arvore = arvores.get(restantes)
+        if arvore is None:
+            arvore = arvores[restantes] = arvore_geradora_minima(distancias, vertices)
+        linha_atual = distancias[atual]
+        linha_origem = distancias[0]
+        limite = custo + arvore + min(linha_atual[v] for v in vertices) + min(linha_origem[v] for v in vertices)
+        if limite >= melhor_custo:
+            podados += 1
+            return
+
+        # Visita primeiro os pontos mais próximos para melhorar a incumbente cedo
+        for v in sorted(vertices, key=linha_atual.__getitem__):
+            rota.append(v)
+            buscar(rota, v, custo + linha_atual[v], restantes & ~(1 << (v - 1)))
+            rota.pop()
+
+    buscar([], 0, 0, (1 << n) - 1)
+    return tabela.para_rotulos(melhor_rota), melhor_custo, explorados, podados
+
+
+def main():
+    matriz = ler_matriz()
+    posicoes = encontrar_pontos(matriz)
+    rota, custo, explorados, podados = resolver_branch_and_bound(posicoes)
+    print("Melhor rota encontrada:", " ".join(rota))
+    print(f"Custo total: {custo} dronômetros")
+    print(f"Nós explorados: {explorados} | Nós podados: {podados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import time
+import numpy as np
+from collections import deque
+from typing import List, Optional, Tuple
+
+# Pontos examinados entre duas consultas ao relógio, quando há prazo
+INTERVALO_PRAZO = 64
+
+
+class _Ciclo:
+    """Rota fechada (origem incluída) com a posição de cada ponto, para consultas O(1)"""
+
+    def __init__(self, pontos: List[int]):
+        self.pontos = pontos
+        self.posicao = [0] * len(pontos)
+        for i, p in enumerate(pontos):
+            self.posicao[p] = i
+
+    def seguinte(self, p: int) -> int:
+        i = self.posicao[p] + 1
+        return self.pontos[i if i < len(self.pontos) else 0]
+
+    def anterior(self, p: int) -> int:
+        return self.pontos[self.posicao[p] - 1]
+
+    def inverter(self, i: int, j: int) -> None:
+        """Inverte o trecho cíclico das posições i a j (ou o complemento, que dá o mesmo ciclo)"""
+        if i > j:
+            i, j = j + 1, i - 1
+        while i < j:
+            a, b = self.pontos[i], self.pontos[j]
+            self.pontos[i], self.pontos[j] = b, a
+            self.posicao[b], self.posicao[a] = i, j
+            i += 1
+            j -= 1
+
+    def mover(self, trecho: List[int], depois_de: int) -> None:
+        """Remove o trecho e o reinsere logo depois de `depois_de`"""
+        no_trecho = set(trecho)
+        restantes = [p for p in self.pontos if p not in no_trecho]
+        i = restantes.index(depois_de) + 1
+        self.pontos = restantes[:i] + trecho + restantes[i:]
+        for k, p in enumerate(self.pontos):
+            self.posicao[p] = k
+
+
+def busca_local(rota: np.ndarray, distancias: np.ndarray, vizinhos: np.ndarray, prazo: Optional[float] = None) -> Tuple[np.ndarray, int]:
+    """Aplica 2-opt e Or-opt até não haver melhora, usando listas de vizinhos e don't-look bits.
+
+    Só são testados movimentos que ligam um ponto a um dos seus k vizinhos mais
+    próximos, e um ponto só volta a ser examinado quando uma aresta sua muda.
+    Com `prazo` (um instante de time.perf_counter()), a busca para ao atingi-lo,
+    mantendo as melhoras já feitas. Retorna a nova rota (sem a origem) e a variação de
+    custo (negativa ou zero).
+    """
+    if len(rota) < 3:
+        return rota.copy(), 0
+    d = distancias.tolist()
+    candidatos = vizinhos.tolist()
+    ciclo = _Ciclo([0] + [int(p) for p in rota])
+    ativos = deque(ciclo.pontos)
+    na_fila = [True] * len(ciclo.pontos)
+    delta_total = 0
+
+    def ativar(*pontos: int) -> None:
+        for p in pontos:
+            if not na_fila[p]:
+                na_fila[p] = True
+                ativos.append(p)
+
+    def dois_opt(a: int) -> bool:
+        nonlocal delta_total
+        for para_frente in (True, False):
+            sentido = ciclo.seguinte if para_frente else ciclo.anterior
+            b = sentido(a)
+            d_ab = d[a][b]
+            for c in candidatos[a]:
+                d_ac = d[a][c]
+                if d_ac >= d_ab:
+                    break
+                e = sentido(c)
+                if c == b or e == a:
+                    continue
+                delta = d_ac + d[b][e] - d_ab - d[c][e]
+                if delta < 0:
+                    if para_frente:
+                        ciclo.inverter(ciclo.posicao[b], ciclo.posicao[c])
+                    else:
+                        ciclo.inverter(ciclo.posicao[a], ciclo.posicao[e])
+                    delta_total += delta
+                    ativar(a, b, c, e)
+                    return True
+        return False
+
+    def or_opt(a: int) -> bool:
+        nonlocal delta_total
+        n = len(ciclo.pontos)
+        for tamanho in (1, 2, 3):
+            if tamanho > n - 3:
+                break
+            trecho = [a]
+            for _ in range(tamanho - 1):
+                trecho.append(ciclo.seguinte(trecho[-1]))
+            primeiro, ultimo = trecho[0], trecho[-1]
+            p, q = ciclo.anterior(primeiro), ciclo.seguinte(ultimo)
+            ganho_remocao = d[p][primeiro] + d[ultimo][q] - d[p][q]
+            no_trecho = set(trecho)
+            for ponta in (primeiro, ultimo):
+                for c in candidatos[ponta]:
+                    if d[ponta][c] >= ganho_remocao:
+                        break
+                    if c in no_trecho:
+                        continue
+                    for x, y in ((c, ciclo.seguinte(c)), (ciclo.anterior(c), c)):
+                        if x in no_trecho or y in no_trecho:
+                            continue
+                        direto = d[x][primeiro] + d[ultimo][y]
+                        invertido = d[x][ultimo] + d[primeiro][y]
+                        delta = min(direto, invertido) - d[x][y] - ganho_remocao
+                        if delta < 0:
+                            ciclo.mover(trecho if direto <= invertido else trecho[::-1], x)
+                            delta_total += delta
+                            ativar(p, q, x, y, *trecho)
+                            return True
+        return False
+
+    examinados = 0
+    while ativos:
+        examinados += 1
+        if prazo is not None and examinados % INTERVALO_PRAZO == 0 and time.perf_counter() >= prazo:
+            break
+        a = ativos.popleft()
+        na_fila[a] = False
+        if dois_opt(a) or or_opt(a):
+            ativar(a)
+
+    # Gira o ciclo para que a rota comece logo depois da origem
+    inicio = ciclo.posicao[0]
+    pontos = ciclo.pontos[inicio + 1:] + ciclo.pontos[:inicio]
+    return np.array(pontos, dtype=rota.dtype), delta_total
@@ -0,0 +1,46 @@
+import numpy as np
+from collections import OrderedDict
+from typing import Optional
+
+
+class CacheRotas:
+    """Cache LRU de pontuações de rotas, com contadores de acertos e falhas.
+
+    Uma rota e a sua inversa descrevem o mesmo percurso saindo e voltando para R,
+    então as duas compartilham a mesma chave canônica.
+    """
+
+    def __init__(self, tamanho_maximo: int):
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._valores: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def chave(rota: np.ndarray) -> bytes:
+        if len(rota) > 1 and rota[0] > rota[-1]:
+            rota = rota[::-1]
+        return np.ascontiguousarray(rota).tobytes()
+
+    def obter(self, chave: bytes) -> Optional[int]:
+        valor = self._valores.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self._valores.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave: bytes, valor: int) -> None:
+        self._valores[chave] = valor
+        self._valores.move_to_end(chave)
+        if len(self._valores) > self.tamanho_maximo:
+            self._valores.popitem(last=False)
+
+    @property
+    def taxa_acerto(self) -> float:
+        consultas = self.acertos + self.falhas
+        return self.acertos / consultas if consultas else 0.0
+
+    def __len__(self) -> int:
+        return len(self._valores)
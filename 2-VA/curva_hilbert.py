@@ -0,0 +1,57 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+from distancias import coordenadas_pontos
+from forca_bruta import ler_matriz, encontrar_pontos
+
+
+def indices_hilbert(linhas: np.ndarray, colunas: np.ndarray) -> np.ndarray:
+    """Posição de cada célula (linha, coluna) ao longo da curva de Hilbert que cobre a grade.
+
+    A grade é completada até um lado potência de 2; cada iteração trata um bit das
+    coordenadas para todos os pontos de uma vez, então o custo é O(n log lado).
+    """
+    x = np.asarray(colunas, dtype=np.int64).copy()
+    y = np.asarray(linhas, dtype=np.int64).copy()
+    lado = 1
+    maior = int(max(x.max(initial=0), y.max(initial=0)))
+    while lado <= maior:
+        lado *= 2
+    indices = np.zeros(len(x), dtype=np.int64)
+    s = lado // 2
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        indices += s * s * ((3 * rx) ^ ry)
+        # Gira o quadrante para que a sub-curva seguinte tenha a orientação padrão
+        girar = ~ry
+        espelhar = girar & rx
+        x = np.where(espelhar, lado - 1 - x, x)
+        y = np.where(espelhar, lado - 1 - y, y)
+        x, y = np.where(girar, y, x), np.where(girar, x, y)
+        s //= 2
+    return indices
+
+
+def rota_curva_hilbert(coordenadas: np.ndarray) -> List[int]:
+    """Entregas (índices 1..n) na ordem da curva de Hilbert, girada para começar depois da
+    origem, que é o índice 0 de `coordenadas`"""
+    ordem = np.argsort(indices_hilbert(coordenadas[:, 0], coordenadas[:, 1]), kind='stable')
+    inicio = int(np.flatnonzero(ordem == 0)[0])
+    return np.concatenate([ordem[inicio + 1:], ordem[:inicio]]).tolist()
+
+
+def encontrar_rota_curva_hilbert(posicoes: Dict[str, Tuple[int, int]]) -> List[str]:
+    rotulos, coordenadas = coordenadas_pontos(posicoes)
+    return [rotulos[i - 1] for i in rota_curva_hilbert(coordenadas)]
+
+
+def main():
+    matriz = ler_matriz()
+    posicoes = encontrar_pontos(matriz)
+    rota = encontrar_rota_curva_hilbert(posicoes)
+    print("Rota pela curva de Hilbert:", " ".join(rota))
+
+
+if __name__ == "__main__":
+    main()
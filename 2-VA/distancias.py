@@ -0,0 +1,81 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Sentinela para distâncias inalcançáveis; cabe em int32 mesmo somado a uma distância
+INFINITO = np.iinfo(np.int32).max // 2
+
+
+def matriz_distancias(origem: Tuple[int, int], coordenadas: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """Monta a matriz de distâncias Manhattan (int32) com a origem no índice 0"""
+    pontos = np.array([origem] + list(coordenadas), dtype=np.int32).reshape(-1, 2)
+    linhas = pontos[:, 0]
+    colunas = pontos[:, 1]
+    return np.abs(linhas[:, None] - linhas[None, :]) + np.abs(colunas[:, None] - colunas[None, :])
+
+
+def coordenadas_pontos(posicoes: Dict[str, Tuple[int, int]]) -> Tuple[List[str], np.ndarray]:
+    """Rótulos das entregas e coordenadas (n + 1, 2), com a origem R no índice 0"""
+    rotulos = [p for p in posicoes if p != 'R']
+    coordenadas = np.array([posicoes['R']] + [posicoes[p] for p in rotulos], dtype=np.int64).reshape(-1, 2)
+    return rotulos, coordenadas
+
+
+def listas_vizinhos(distancias: np.ndarray, k: int) -> np.ndarray:
+    """Para cada ponto (origem incluída), os k pontos mais próximos em ordem de distância"""
+    n = len(distancias)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.intp)
+    ordem = np.argsort(distancias, axis=1, kind='stable')
+    # Remove o próprio ponto de cada linha antes de cortar os k primeiros
+    sem_proprio = ordem[ordem != np.arange(n)[:, None]].reshape(n, n - 1)
+    return sem_proprio[:, :k]
+
+
+@dataclass
+class TabelaDistancias:
+    """Entregas mapeadas para índices inteiros 1..n; a origem R fica no índice 0"""
+    rotulos: List[str]
+    indices: Dict[str, int]
+    matriz: np.ndarray
+    coordenadas: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # (n + 1, 2), origem no índice 0
+    _vizinhos: Dict[int, np.ndarray] = field(default_factory=dict, repr=False, compare=False)
+
+    def para_indices(self, rota: Sequence[str]) -> np.ndarray:
+        return np.array([self.indices[p] for p in rota], dtype=np.intp)
+
+    def para_rotulos(self, rota: Sequence[int]) -> List[str]:
+        return [self.rotulos[i - 1] for i in rota]
+
+    def vizinhos(self, k: int) -> np.ndarray:
+        """Listas dos k vizinhos mais próximos de cada ponto, calculadas uma única vez"""
+        if k not in self._vizinhos:
+            self._vizinhos[k] = listas_vizinhos(self.matriz, k)
+        return self._vizinhos[k]
+
+    def custo(self, rota: Sequence[int]) -> int:
+        """Custo da rota (em índices), saindo e voltando para a origem"""
+        if len(rota) == 0:
+            return 0
+        rota = np.asarray(rota)
+        return int(self.matriz[0, rota[0]] + self.matriz[rota[:-1], rota[1:]].sum() + self.matriz[rota[-1], 0])
+
+    def custos(self, populacao: np.ndarray) -> np.ndarray:
+        """Custo de cada linha de uma matriz (P, n) de rotas, numa única operação"""
+        if populacao.shape[1] == 0:
+            return np.zeros(len(populacao), dtype=np.int64)
+        return (self.matriz[0, populacao[:, 0]].astype(np.int64)
+                + self.matriz[populacao[:, :-1], populacao[:, 1:]].sum(axis=1, dtype=np.int64)
+                + self.matriz[populacao[:, -1], 0])
+
+
+def construir_tabela(origem: Tuple[int, int], pontos: Dict[str, Tuple[int, int]], rotulos: Optional[Sequence[str]] = None) -> TabelaDistancias:
+    """Constrói a tabela de distâncias das entregas, na ordem de `rotulos` (ou do dicionário)"""
+    if rotulos is None:
+        rotulos = [p for p in pontos if p != 'R']
+    rotulos = list(rotulos)
+    indices = {p: i + 1 for i, p in enumerate(rotulos)}
+    coordenadas = [pontos[p] for p in rotulos]
+    return TabelaDistancias(rotulos, indices, matriz_distancias(origem, coordenadas),
+                            np.array([origem] + coordenadas, dtype=np.int64).reshape(-1, 2))
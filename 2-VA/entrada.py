@@ -0,0 +1,168 @@
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# Leitura das instâncias em dois formatos, detectados automaticamente:
+#
+#   denso (o original)          esparso (uma célula ocupada por linha)
+#   3 4                         3 4 esparso  <- dimensões (e marcador), opcionais
+#   0 0 0 A                     A 0 3
+#   0 R 0 0                     R 1 1
+#   B 0 0 0                     B 2 0
+#
+# Os dois viram uma MatrizEsparsa, que guarda só as células ocupadas; no formato
+# esparso o custo da leitura depende do número de entregas, não da área da grade.
+
+# Marcadores aceitos depois das dimensões, que dispensam a detecção
+MARCADOR_ESPARSO = b'esparso'
+MARCADOR_DENSO = b'denso'
+
+
+class MatrizEsparsa:
+    """Grade de entregas que guarda só as células ocupadas.
+
+    Indexar uma linha (matriz[i][j], len(matriz[0])) monta essa linha densa na hora,
+    então o código que espera uma lista de listas continua funcionando.
+    """
+
+    def __init__(self, linhas: int, colunas: int, pontos: Dict[str, Tuple[int, int]]):
+        self.linhas = linhas
+        self.colunas = colunas
+        self.pontos = pontos
+        self._por_linha: Dict[int, List[Tuple[int, str]]] = {}
+        for rotulo, (i, j) in pontos.items():
+            self._por_linha.setdefault(i, []).append((j, rotulo))
+
+    def __len__(self) -> int:
+        return self.linhas
+
+    def __getitem__(self, i: int) -> List[str]:
+        if not -self.linhas <= i < self.linhas:
+            raise IndexError(i)
+        linha = ['0'] * self.colunas
+        for j, rotulo in self._por_linha.get(i % self.linhas, ()):
+            linha[j] = rotulo
+        return linha
+
+    def __iter__(self) -> Iterator[List[str]]:
+        for i in range(self.linhas):
+            yield self[i]
+
+    def para_texto(self) -> str:
+        """Texto no formato esparso, com a linha de dimensões e o marcador"""
+        return f"{self.linhas} {self.colunas} {MARCADOR_ESPARSO.decode()}\n" + "\n".join(f"{r} {i} {j}" for r, (i, j) in self.pontos.items())
+
+
+def _inteiro(token: bytes) -> bool:
+    return token.isdigit()
+
+
+def _forma_esparsa(partes: List[bytes]) -> bool:
+    # 'rótulo linha coluna'
+    return len(partes) == 3 and _inteiro(partes[1]) and _inteiro(partes[2])
+
+
+def _cabecalho(partes: List[bytes]) -> Optional[bytes]:
+    # Marcador da linha de dimensões ('' sem marcador), ou None se ela não for de dimensões
+    if len(partes) in (2, 3) and _inteiro(partes[0]) and _inteiro(partes[1]):
+        marcador = partes[2].lower() if len(partes) == 3 else b''
+        if marcador in (b'', MARCADOR_ESPARSO, MARCADOR_DENSO):
+            return marcador
+    return None
+
+
+def _ler_denso(cabecalho: List[bytes], linhas: List[bytes]) -> MatrizEsparsa:
+    total_linhas, total_colunas = int(cabecalho[0]), int(cabecalho[1])
+    pontos: Dict[str, Tuple[int, int]] = {}
+    for i, linha in enumerate(linhas):
+        # Linha só de zeros e espaços: nada a guardar, e nem é preciso separá-la em tokens
+        if not linha.translate(None, b'0 \t\r') and b'00' not in linha:
+            continue
+        for j, valor in enumerate(linha.split()):
+            if valor != b'0':
+                pontos[valor.decode()] = (i, j)
+    return MatrizEsparsa(total_linhas, total_colunas, pontos)
+
+
+def _ler_esparso(cabecalho: Optional[List[bytes]], linhas: List[bytes]) -> MatrizEsparsa:
+    pontos: Dict[str, Tuple[int, int]] = {}
+    maior_linha = maior_coluna = -1
+    for numero, linha in enumerate(linhas, 1):
+        partes = linha.split()
+        if len(partes) != 3 or not (_inteiro(partes[1]) and _inteiro(partes[2])):
+            raise ValueError(f"Linha {numero} da entrada esparsa deveria ser 'rótulo linha coluna': {linha.decode(errors='replace')!r}")
+        i, j = int(partes[1]), int(partes[2])
+        pontos[partes[0].decode()] = (i, j)
+        maior_linha = max(maior_linha, i)
+        maior_coluna = max(maior_coluna, j)
+    if cabecalho is None:
+        return MatrizEsparsa(maior_linha + 1, maior_coluna + 1, pontos)
+    return MatrizEsparsa(int(cabecalho[0]), int(cabecalho[1]), pontos)
+
+
+def ler_texto(texto: Union[str, bytes]) -> MatrizEsparsa:
+    """Interpreta uma instância em qualquer um dos formatos.
+
+    Sem linha de dimensões a entrada é esparsa. Com 'L C esparso' ou 'L C denso' o
+    formato é o do marcador. Só com 'L C', a entrada é esparsa quando todas as linhas
+    seguintes têm a forma 'rótulo linha coluna', e densa (as L primeiras linhas, com
+    quantos valores tiverem) caso contrário. Numa grade de 3 colunas as linhas densas
+    também podem ter essa forma: ali, sem marcador, a entrada com pelo menos L linhas é
+    lida como densa.
+    """
+    if isinstance(texto, str):
+        texto = texto.encode()
+    linhas = [linha for linha in texto.split(b'\n') if linha.strip()]
+    if not linhas:
+        raise ValueError("Entrada vazia")
+    cabecalho = linhas[0].split()
+    marcador = _cabecalho(cabecalho)
+    if marcador is None:
+        return _ler_esparso(None, linhas)
+    dados = linhas[1:]
+    if not marcador:
+        total_linhas, total_colunas = int(cabecalho[0]), int(cabecalho[1])
+        esparso = bool(dados) and all(_forma_esparsa(linha.split()) for linha in dados)
+        if esparso and total_colunas == 3 and len(dados) >= total_linhas:
+            esparso = False
+        marcador = MARCADOR_ESPARSO if esparso else MARCADOR_DENSO
+    if marcador == MARCADOR_ESPARSO:
+        return _ler_esparso(cabecalho, dados)
+    return _ler_denso(cabecalho, dados[:int(cabecalho[0])])
+
+
+def ler_entrada(fluxo=None) -> MatrizEsparsa:
+    """Lê uma instância da entrada padrão (ou de `fluxo`, um arquivo binário).
+
+    Redirecionada de arquivo ou pipe, a entrada é lida de uma vez até o fim. Digitada no
+    terminal, a leitura para depois das L linhas do formato denso ou, no esparso, na
+    primeira linha em branco; sem marcador, o formato é decidido pela primeira linha de
+    dados, com as mesmas regras de ler_texto.
+    """
+    if fluxo is None:
+        fluxo = sys.stdin.buffer
+    if not fluxo.isatty():
+        return ler_texto(fluxo.read())
+
+    linhas: List[bytes] = []
+    restantes = None
+    while restantes is None or restantes > 0:
+        linha = fluxo.readline()
+        if not linha:
+            break
+        if not linha.strip():
+            if linhas and restantes is None:
+                break
+            continue
+        linhas.append(linha)
+        if len(linhas) == 2:
+            # Só com a primeira linha de dados dá para saber se a entrada é densa
+            cabecalho = linhas[0].split()
+            marcador = _cabecalho(cabecalho)
+            if marcador == b'':
+                denso = not _forma_esparsa(linha.split()) or int(cabecalho[1]) == 3
+                marcador = MARCADOR_DENSO if denso else MARCADOR_ESPARSO
+            if marcador == MARCADOR_DENSO:
+                restantes = int(cabecalho[0]) - 1
+        elif restantes is not None:
+            restantes -= 1
+    return ler_texto(b''.join(linhas))
@@ -1,5 +1,14 @@
+import argparse
+
 from algoritmo_genetico import FlyFoodAG, ConfiguracoesAG
-from forca_bruta import ler_matriz, encontrar_pontos, calcular_distancia, gerar_permutacoes
+from forca_bruta import ler_matriz, encontrar_pontos, calcular_distancia, gerar_rotas, encontrar_rota_paralela, MINIMO_PARALELO
+from curva_hilbert import encontrar_rota_curva_hilbert
+from held_karp import held_karp
+from lin_kernighan import resolver_lin_kernighan
+from vizinho_mais_proximo import encontrar_rota_mais_proxima
+from distancias import construir_tabela
+from entrada import MatrizEsparsa
+from modelo_custo import FRACAO_SEMENTES_AG, Plano, carregar_modelo, planejar
 
 
 def calcular_custo_rota(origem, pontos_dict, rota):
@@ -12,25 +21,38 @@ def calcular_custo_rota(origem, pontos_dict, rota):
     return custo
 
 
-def resolver_forca_bruta(matriz):
+def resolver_forca_bruta(matriz, processos=1):
     pontos = encontrar_pontos(matriz)
     origem = pontos['R']
     pontos_entrega = [p for p in pontos if p != 'R']
 
-    permutacoes = gerar_permutacoes(pontos_entrega)
+    # processos=None usa todos os núcleos disponíveis, mas só a partir de
+    # MINIMO_PARALELO entregas; abaixo disso a busca serial é mais rápida que o pool
+    if processos != 1 and len(pontos_entrega) >= MINIMO_PARALELO:
+        _, melhor_rota = encontrar_rota_paralela(origem, pontos, pontos_entrega, processos)
+        return melhor_rota
+
     menor_custo = None
     melhor_rota = None
 
-    for rota in permutacoes:
-        custo = calcular_custo_rota(origem, pontos, rota)
+    for custo, rota in gerar_rotas(origem, pontos, pontos_entrega):
         if menor_custo is None or custo < menor_custo:
             menor_custo = custo
-            melhor_rota = rota
+            melhor_rota = rota.copy()
 
     return melhor_rota
 
 
+def resolver_held_karp(matriz):
+    pontos = encontrar_pontos(matriz)
+    tabela = construir_tabela(pontos['R'], pontos)
+    rota, _ = held_karp(tabela.matriz)
+    return tabela.para_rotulos(rota)
+
+
 def matriz_para_string(matriz):
+    if isinstance(matriz, MatrizEsparsa):
+        return matriz.para_texto()
     linhas = len(matriz)
     colunas = len(matriz[0]) if matriz else 0
     texto = f"{linhas} {colunas}\n"
@@ -39,23 +61,76 @@ def matriz_para_string(matriz):
     return texto
 
 
-def main():
+# Nome e marcador de cada motor nas mensagens
+MOTORES = {
+    'forca_bruta': "🔵 Algoritmo escolhido: Força Bruta",
+    'held_karp': "🟣 Algoritmo escolhido: Held-Karp (Programação Dinâmica)",
+    'ag': "🟢 Algoritmo escolhido: Algoritmo Genético com Order Crossover (OX)",
+    'lin_kernighan': "🟠 Algoritmo escolhido: Lin-Kernighan com Or-opt",
+    'hilbert': "🟤 Algoritmo escolhido: Curva de Hilbert",
+    'vizinho_mais_proximo': "🟡 Algoritmo escolhido: Vizinho Mais Próximo",
+}
+
+
+def plano_fixo(motor, tempo_limite_ms=None):
+    """Plano de um motor escolhido à mão, com as configurações de sempre"""
+    if motor == 'ag':
+        return Plano('ag', None, dict(tamanho_populacao=150, numero_geracoes=1000, fracao_sementes=FRACAO_SEMENTES_AG, tempo_limite_ms=tempo_limite_ms))
+    if motor == 'lin_kernighan':
+        return Plano('lin_kernighan', None, dict(tempo_limite_ms=tempo_limite_ms))
+    return Plano(motor, None)
+
+
+def resolver(plano, matriz, processos=None):
+    """Executa o plano na matriz e devolve a rota (rótulos das entregas).
+
+    `processos` vai para a força bruta: None usa todos os núcleos, 1 busca no próprio
+    processo (obrigatório dentro de processos daemon, que não podem criar filhos).
+    """
+    pontos = encontrar_pontos(matriz)
+    if plano.motor == 'forca_bruta':
+        return resolver_forca_bruta(matriz, processos)
+    if plano.motor == 'held_karp':
+        return resolver_held_karp(matriz)
+    if plano.motor == 'ag':
+        configuracoes = ConfiguracoesAG(metodo_crossover='order', **plano.parametros)
+        melhor, _, _, _, _ = FlyFoodAG(configuracoes=configuracoes).executar(matriz_para_string(matriz))
+        return melhor
+    if plano.motor == 'lin_kernighan':
+        rota, _ = resolver_lin_kernighan(pontos, **plano.parametros)
+        return rota
+    if plano.motor == 'hilbert':
+        return encontrar_rota_curva_hilbert(pontos)
+    if plano.motor == 'vizinho_mais_proximo':
+        return encontrar_rota_mais_proxima(pontos, pontos['R'])
+    raise ValueError(f"Motor desconhecido: {plano.motor}")
+
+
+def main(tempo_limite_ms=None, motor='auto', modelo=None):
     matriz = ler_matriz()
     pontos = encontrar_pontos(matriz)
-    pontos_entrega = [p for p in pontos if p != 'R']
-    if len(pontos_entrega) <= 9:
-        print("\n🔵 Algoritmo escolhido: Força Bruta")
-        rota = resolver_forca_bruta(matriz)
-        print('Melhor rota encontrada:', ' '.join(rota))
+    if motor == 'auto':
+        # O orçamento vale para a execução toda; o modelo de custo escolhe motor e parâmetros.
+        # A calibração nunca roda aqui: só com --calibrar, antes de ler a matriz
+        modelo = modelo or carregar_modelo()
+        if not modelo.maquina:
+            print("Modelo de custo não calibrado nesta máquina: usando as constantes padrão (rode com --calibrar)")
+        plano = planejar(len(pontos) - 1, tempo_limite_ms, modelo)
     else:
-        print("\n🟢 Algoritmo escolhido: Algoritmo Genético com Order Crossover (OX)")
-        matriz_txt = matriz_para_string(matriz)
-        configuracoes = ConfiguracoesAG(tamanho_populacao=150, numero_geracoes=1000, metodo_crossover='order')
-        ga = FlyFoodAG(configuracoes=configuracoes)
-        melhor, inicio, pontos_entregas, matriz, distancias = ga.executar(matriz_txt)
-        print('Melhor rota encontrada:', ' '.join(melhor))
+        plano = plano_fixo(motor, tempo_limite_ms)
+    print("\n" + MOTORES[plano.motor])
+    if plano.estimativa_ms is not None:
+        print(f"Tempo estimado: {plano.estimativa_ms:.0f} ms")
+    rota = resolver(plano, matriz)
+    print('Melhor rota encontrada:', ' '.join(rota))
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FlyFood: rota de entregas do drone")
+    parser.add_argument('--tempo-limite-ms', type=int, default=None, help="orçamento de tempo; com --motor auto vale para a execução toda, senão limita o AG ou o Lin-Kernighan")
+    parser.add_argument('--motor', choices=['auto', *MOTORES], default='auto', help="algoritmo usado; 'auto' escolhe pelo modelo de custo desta máquina")
+    parser.add_argument('--calibrar', action='store_true', help="mede (ou refaz) o modelo de custo desta máquina antes de resolver")
+    argumentos = parser.parse_args()
+    modelo = carregar_modelo(recalibrar=True) if argumentos.calibrar else None
     print("Cole sua matriz: ")
-    main()
+    main(argumentos.tempo_limite_ms, argumentos.motor, modelo)
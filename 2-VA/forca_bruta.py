@@ -1,24 +1,16 @@
+import multiprocessing
+
+from distancias import construir_tabela
+from entrada import MatrizEsparsa, ler_entrada
+
 def ler_matriz():
-    """Lê a matriz da entrada padrão conforme o formato especificado"""
-    primeira_linha = input().strip()
-    while primeira_linha == '':
-        primeira_linha = input().strip()
-    
-    partes = primeira_linha.split()
-    linhas = int(partes[0])
-    
-    matriz = []
-    for _ in range(linhas):
-        linha = input().strip()
-        while linha == '':
-            linha = input().strip()
-        elementos = linha.split()
-        matriz.append(elementos)
-    
-    return matriz
+    """Lê a matriz da entrada padrão, no formato denso ou no esparso (rótulo linha coluna)"""
+    return ler_entrada()
 
 def encontrar_pontos(matriz):
     """Encontra todos os pontos nomeados na matriz e suas coordenadas"""
+    if isinstance(matriz, MatrizEsparsa):
+        return dict(matriz.pontos)
     pontos = {}
     for i in range(len(matriz)):
         for j in range(len(matriz[i])):
@@ -40,19 +32,160 @@ def calcular_distancia(p1, p2):
     
     return diff_linha + diff_coluna
 
-def gerar_permutacoes(elementos):
-    """Gera todas as permutações possíveis de uma lista de elementos"""
+def iterar_permutacoes(elementos):
+    """Gera, sob demanda, todas as permutações possíveis de uma lista de elementos"""
     if len(elementos) <= 1:
-        return [elementos]
+        yield elementos
+        return
     
-    resultado = []
     for i in range(len(elementos)):
         elemento_atual = elementos[i]
         elementos_restantes = elementos[:i] + elementos[i+1:]
-        for p in gerar_permutacoes(elementos_restantes):
-            resultado.append([elemento_atual] + p)
+        for p in iterar_permutacoes(elementos_restantes):
+            yield [elemento_atual] + p
+
+def gerar_permutacoes(elementos):
+    """Gera todas as permutações possíveis de uma lista de elementos"""
+    return list(iterar_permutacoes(elementos))
+
+def gerar_rotas(origem, pontos, rotulos, prefixo=(), limite=None):
+    """Percorre as rotas em profundidade sem montar a lista de permutações.
+    
+    O custo do prefixo é acumulado ao descer, então prefixos em comum são calculados
+    uma única vez. Como a distância é simétrica, uma rota e a sua espelhada têm o mesmo
+    custo: só é gerada aquela cujo primeiro ponto vem antes do último em `rotulos`, e
+    os ramos que só levariam a espelhadas são podados assim que isso fica decidido.
+    Produz pares (custo, rota) na mesma ordem das permutações; a lista `rota` é
+    reaproveitada entre as iterações, então copie-a se precisar guardá-la.
+    
+    `prefixo` fixa os índices das primeiras paradas (um ramo da árvore). Se `limite`
+    for informado, ramos cujo custo mais a volta direta para a origem já supera
+    `limite()` são descartados.
+    """
+    n = len(rotulos)
+    # Linha/coluna 0 é a origem e a entrega rotulos[i] fica no índice i + 1
+    distancias = construir_tabela(origem, pontos, rotulos).matriz.tolist()
+    usado = [False] * n
+    indices = []
+    rota = []
     
-    return resultado
+    atual = 0
+    custo = 0
+    for i in prefixo:
+        usado[i] = True
+        indices.append(i)
+        rota.append(rotulos[i])
+        custo += distancias[atual][i + 1]
+        atual = i + 1
+    
+    # A última parada precisa ter índice maior que a primeira; `maiores` conta as
+    # entregas livres nessa condição, e a última delas fica reservada para o fim
+    maiores = 0
+    if indices:
+        maiores = sum(1 for i in range(indices[0] + 1, n) if not usado[i])
+        if len(indices) == n:
+            if n > 1 and indices[-1] < indices[0]:
+                return
+        elif maiores == 0:
+            return
+    
+    def descer(atual, custo, maiores):
+        if len(rota) == n:
+            yield custo + distancias[atual][0], rota
+            return
+        
+        linha = distancias[atual]
+        ultimo = len(rota) == n - 1
+        for i in range(n):
+            if usado[i]:
+                continue
+            # Descarta os ramos que só levam a espelhadas de rotas já geradas
+            if not indices:
+                if n > 1 and i == n - 1:
+                    continue
+                maiores_proximo = n - 1 - i
+            else:
+                maior = i > indices[0]
+                if ultimo and not maior:
+                    continue
+                if not ultimo and maior and maiores == 1:
+                    continue
+                maiores_proximo = maiores - maior
+            proximo = i + 1
+            custo_proximo = custo + linha[proximo]
+            if limite is not None and custo_proximo + distancias[proximo][0] > limite():
+                continue
+            usado[i] = True
+            indices.append(i)
+            rota.append(rotulos[i])
+            yield from descer(proximo, custo_proximo, maiores_proximo)
+            rota.pop()
+            indices.pop()
+            usado[i] = False
+    
+    yield from descer(atual, custo, maiores)
+
+# Abaixo deste número de entregas a busca inteira leva menos que criar o pool
+MINIMO_PARALELO = 8
+
+# Melhor custo global compartilhado entre os processos da busca paralela
+_melhor_compartilhado = None
+_trava_compartilhada = None
+
+def _inicializar_processo(melhor, trava):
+    global _melhor_compartilhado, _trava_compartilhada
+    _melhor_compartilhado = melhor
+    _trava_compartilhada = trava
+
+def _buscar_ramo(tarefa):
+    """Busca a melhor rota de um ramo, podando contra o melhor custo global"""
+    origem, pontos, rotulos, prefixo = tarefa
+    menor_custo = None
+    melhor_rota = None
+    
+    for custo, rota in gerar_rotas(origem, pontos, rotulos, prefixo, limite=lambda: _melhor_compartilhado.value):
+        if menor_custo is None or custo < menor_custo:
+            menor_custo = custo
+            melhor_rota = rota.copy()
+            with _trava_compartilhada:
+                if custo < _melhor_compartilhado.value:
+                    _melhor_compartilhado.value = custo
+    
+    return menor_custo, melhor_rota
+
+def encontrar_rota_paralela(origem, pontos, rotulos, processos=None):
+    """Divide a busca exaustiva pelas primeiras paradas entre vários processos.
+    
+    Cada ramo devolve a primeira rota de menor custo na sua ordem, e os ramos são
+    combinados na ordem das permutações, então o resultado (inclusive em empates) é
+    idêntico ao da busca serial. Com menos de MINIMO_PARALELO entregas a busca é
+    feita no próprio processo. Retorna (custo, rota).
+    """
+    n = len(rotulos)
+    if n < MINIMO_PARALELO or processos == 1:
+        menor_custo = None
+        melhor_rota = None
+        for custo, rota in gerar_rotas(origem, pontos, rotulos):
+            if menor_custo is None or custo < menor_custo:
+                menor_custo = custo
+                melhor_rota = rota.copy()
+        return menor_custo, melhor_rota
+    
+    prefixos = [(i, j) for i in range(n) for j in range(n) if i != j]
+    tarefas = [(origem, pontos, rotulos, prefixo) for prefixo in prefixos]
+    
+    melhor = multiprocessing.Value('q', 2 ** 62, lock=False)
+    trava = multiprocessing.Lock()
+    with multiprocessing.Pool(processos, initializer=_inicializar_processo, initargs=(melhor, trava)) as pool:
+        resultados = pool.map(_buscar_ramo, tarefas, chunksize=1)
+    
+    menor_custo = None
+    melhor_rota = None
+    for custo, rota in resultados:
+        if custo is not None and (menor_custo is None or custo < menor_custo):
+            menor_custo = custo
+            melhor_rota = rota
+    return menor_custo, melhor_rota
 
 def encontrar_rota_otimizada():
     """Encontra a rota mais curta para as entregas do drone"""
@@ -68,25 +201,13 @@ def encontrar_rota_otimizada():
     if not pontos_entrega:
         return ""
     
-    permutacoes = gerar_permutacoes(pontos_entrega)
     menor_custo = None
     melhor_rota = None
     
-    for rota in permutacoes:
-        custo = 0
-        ponto_atual = origem
-        
-        for ponto in rota:
-            proximo_ponto = pontos[ponto]
-            custo += calcular_distancia(ponto_atual, proximo_ponto)
-            ponto_atual = proximo_ponto
-        
-        # Volta para a origem
-        custo += calcular_distancia(ponto_atual, origem)
-        
+    for custo, rota in gerar_rotas(origem, pontos, pontos_entrega):
         if menor_custo is None or custo < menor_custo:
             menor_custo = custo
-            melhor_rota = rota
+            melhor_rota = rota.copy()
     
     # Formata a saída como string
     if melhor_rota:
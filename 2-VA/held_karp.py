@@ -0,0 +1,80 @@
+import numpy as np
+from typing import List, Tuple
+
+from distancias import INFINITO, construir_tabela
+from forca_bruta import ler_matriz, encontrar_pontos
+
+
+def held_karp(distancias: np.ndarray) -> Tuple[List[int], int]:
+    """Resolve o TSP de forma exata por programação dinâmica sobre subconjuntos.
+
+    `distancias` tem a origem no índice 0 e as entregas em 1..n. Retorna a ordem de
+    visita (índices 1..n das entregas) e o custo total. Em caso de empate devolve a
+    rota lexicograficamente menor, que é a mesma escolhida pela força bruta.
+    """
+    n = len(distancias) - 1
+    if n <= 0:
+        return [], 0
+
+    d = np.ascontiguousarray(distancias[1:, 1:], dtype=np.int32)
+    saida = np.ascontiguousarray(distancias[0, 1:], dtype=np.int32)
+    total = 1 << n
+
+    # dp[mascara, j]: menor custo saindo da origem, visitando `mascara` e terminando em j
+    dp = np.full((total, n), INFINITO, dtype=np.int32)
+    indices = np.arange(n)
+    dp[1 << indices, indices] = saida
+
+    mascaras = np.arange(total, dtype=np.int64)
+    quantidade_bits = np.zeros(total, dtype=np.int8)
+    for k in range(n):
+        quantidade_bits += ((mascaras >> k) & 1).astype(np.int8)
+
+    # Processa os subconjuntos por tamanho, de forma vetorizada em cada camada
+    for tamanho in range(2, n + 1):
+        camada = mascaras[quantidade_bits == tamanho]
+        for k in range(n):
+            alvo = camada[(camada >> k) & 1 == 1]
+            anterior = alvo ^ (1 << k)
+            dp[alvo, k] = (dp[anterior] + d[:, k]).min(axis=1)
+
+    completa = total - 1
+    custo = int((dp[completa] + saida).min())
+
+    # Reconstrói a rota do início para o fim. Como a distância é simétrica,
+    # dp[restante, j] também é o custo de sair de j, visitar o restante e voltar a R.
+    rota = []
+    restante = completa
+    custo_restante = custo
+    atual = None
+    while restante:
+        for j in range(n):
+            if not (restante >> j) & 1:
+                continue
+            passo = saida[j] if atual is None else d[atual, j]
+            if passo + dp[restante, j] == custo_restante:
+                rota.append(j + 1)
+                custo_restante = int(dp[restante, j])
+                restante ^= 1 << j
+                atual = j
+                break
+
+    return rota, custo
+
+
+def encontrar_rota_otimizada():
+    """Encontra a rota mais curta para as entregas do drone"""
+    matriz = ler_matriz()
+    pontos = encontrar_pontos(matriz)
+
+    if 'R' not in pontos:
+        return "Ponto R não encontrado"
+
+    tabela = construir_tabela(pontos['R'], pontos)
+    rota, _ = held_karp(tabela.matriz)
+    return ' '.join(tabela.para_rotulos(rota))
+
+
+if __name__ == "__main__":
+    resultado = encontrar_rota_otimizada()
+    print(resultado)
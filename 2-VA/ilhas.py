@@ -0,0 +1,136 @@
+import multiprocessing
+import numpy as np
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from algoritmo_genetico import FlyFoodAG, ConfiguracoesAG
+from distancias import TabelaDistancias
+
+
+@dataclass
+class ConfiguracoesIlhas:
+    numero_ilhas: int = 4
+    intervalo_migracao: int = 50  # gerações entre migrações
+    numero_migrantes: int = 2
+    topologia: str = 'anel'  # 'anel' ou 'completa'
+    metodos_crossover: Optional[List[str]] = None  # um por ilha, em ciclo; None usa o do AG
+    processos: Optional[int] = None  # None usa um processo por ilha
+
+
+# Tabela de distâncias de cada processo, enviada uma única vez na criação do pool
+_tabela_ilha: Optional[TabelaDistancias] = None
+
+
+def _inicializar_ilha(tabela: TabelaDistancias) -> None:
+    global _tabela_ilha
+    _tabela_ilha = tabela
+
+
+def _evoluir_ilha(tarefa):
+    """Recebe os migrantes, evolui a ilha por algumas gerações e devolve o novo estado"""
+    configuracoes, rng, populacao, pontuacoes, migrantes, pontuacoes_migrantes, geracoes = tarefa
+    ag = FlyFoodAG(configuracoes)
+    ag.rng = rng
+
+    if populacao is None:
+        populacao = ag.populacao_inicial(_tabela_ilha)
+        pontuacoes = ag.avaliacao_populacao(populacao, _tabela_ilha)
+    if migrantes is not None and len(migrantes):
+        # Os migrantes substituem os piores indivíduos da ilha
+        piores = np.argsort(pontuacoes, kind='stable')[:len(migrantes)]
+        populacao[piores] = migrantes
+        pontuacoes[piores] = pontuacoes_migrantes
+
+    historico = []
+    for _ in range(geracoes):
+        historico.append(-int(pontuacoes.max()))
+        populacao, pontuacoes = ag.proxima_geracao(populacao, pontuacoes, _tabela_ilha)
+    return ag.rng, populacao, pontuacoes, historico
+
+
+class FlyFoodIlhas:
+    """Modelo de ilhas: várias populações do FlyFoodAG evoluem em processos separados
+    e trocam seus melhores indivíduos (como arrays de índices) a cada intervalo."""
+
+    def __init__(self, configuracoes: Optional[ConfiguracoesAG] = None, configuracoes_ilhas: Optional[ConfiguracoesIlhas] = None):
+        self.configuracoes = configuracoes if configuracoes else ConfiguracoesAG()
+        self.configuracoes_ilhas = configuracoes_ilhas if configuracoes_ilhas else ConfiguracoesIlhas()
+
+    def configuracoes_da_ilha(self, ilha: int) -> ConfiguracoesAG:
+        metodos = self.configuracoes_ilhas.metodos_crossover
+        if not metodos:
+            return self.configuracoes
+        return replace(self.configuracoes, metodo_crossover=metodos[ilha % len(metodos)])
+
+    def destinos(self, ilha: int) -> List[int]:
+        """Ilhas que recebem os emigrantes de `ilha`"""
+        n = self.configuracoes_ilhas.numero_ilhas
+        if self.configuracoes_ilhas.topologia == 'anel':
+            return [(ilha + 1) % n] if n > 1 else []
+        if self.configuracoes_ilhas.topologia == 'completa':
+            return [outra for outra in range(n) if outra != ilha]
+        raise ValueError(f"Topologia desconhecida: {self.configuracoes_ilhas.topologia}")
+
+    def migrar(self, estados) -> List[Tuple[Optional[np.ndarray], Optional[np.ndarray]]]:
+        """Escolhe, para cada ilha, os melhores indivíduos entre os que chegam das vizinhas"""
+        n = self.configuracoes_ilhas.numero_ilhas
+        quantidade = self.configuracoes_ilhas.numero_migrantes
+        chegadas: List[List[int]] = [[] for _ in range(n)]
+        for origem in range(n):
+            for destino in self.destinos(origem):
+                chegadas[destino].append(origem)
+
+        migracoes = []
+        for destino in range(n):
+            if not chegadas[destino] or quantidade <= 0:
+                migracoes.append((None, None))
+                continue
+            candidatos = []
+            pontuacoes_candidatos = []
+            for origem in chegadas[destino]:
+                _, populacao, pontuacoes, _ = estados[origem]
+                melhores = np.argsort(-pontuacoes, kind='stable')[:quantidade]
+                candidatos.append(populacao[melhores])
+                pontuacoes_candidatos.append(pontuacoes[melhores])
+            candidatos = np.concatenate(candidatos)
+            pontuacoes_candidatos = np.concatenate(pontuacoes_candidatos)
+            escolhidos = np.argsort(-pontuacoes_candidatos, kind='stable')[:quantidade]
+            migracoes.append((candidatos[escolhidos].copy(), pontuacoes_candidatos[escolhidos].copy()))
+        return migracoes
+
+    def executar(self, matriz_txt: str) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], List[List[str]], List[int]]:
+        ilhas = self.configuracoes_ilhas
+        base = FlyFoodAG(self.configuracoes)
+        matriz, inicio, pontos_entregas = base.ler_matriz_texto(matriz_txt)
+        tabela = base.tabela_distancias(inicio, pontos_entregas)
+
+        # Cada ilha tem o seu próprio fluxo de números aleatórios
+        sementes = np.random.SeedSequence(self.configuracoes.semente).spawn(ilhas.numero_ilhas)
+        estados = [(np.random.default_rng(s), None, None, []) for s in sementes]
+        migracoes = [(None, None)] * ilhas.numero_ilhas
+        melhores_distancias: List[int] = []
+
+        processos = ilhas.processos or ilhas.numero_ilhas
+        with multiprocessing.Pool(processos, initializer=_inicializar_ilha, initargs=(tabela,)) as pool:
+            restantes = self.configuracoes.numero_geracoes
+            while True:
+                geracoes = min(ilhas.intervalo_migracao, restantes)
+                tarefas = [
+                    (self.configuracoes_da_ilha(i), rng, populacao, pontuacoes, migrantes, pontuacoes_migrantes, geracoes)
+                    for i, ((rng, populacao, pontuacoes, _), (migrantes, pontuacoes_migrantes)) in enumerate(zip(estados, migracoes))
+                ]
+                estados = pool.map(_evoluir_ilha, tarefas, chunksize=1)
+                melhores_distancias.extend(min(historicos) for historicos in zip(*(e[3] for e in estados)))
+                restantes -= geracoes
+                if restantes <= 0:
+                    break
+                migracoes = self.migrar(estados)
+
+        melhor_pontuacao = None
+        melhor = None
+        for _, populacao, pontuacoes, _ in estados:
+            k = int(np.argmax(pontuacoes))
+            if melhor_pontuacao is None or pontuacoes[k] > melhor_pontuacao:
+                melhor_pontuacao = pontuacoes[k]
+                melhor = populacao[k]
+        return tabela.para_rotulos(melhor.tolist()), inicio, pontos_entregas, matriz, melhores_distancias
@@ -0,0 +1,83 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+
+class GradeEspacial:
+    """Índice de pontos em baldes de uma grade, para buscas de vizinho mais próximo
+    pela distância Manhattan com remoção de pontos.
+
+    Cada ponto é identificado pela sua linha em `coordenadas`. A busca percorre anéis
+    de células cada vez mais afastados da célula da consulta e para quando nenhuma
+    célula ainda não vista pode ter um ponto tão perto quanto o melhor encontrado.
+    Empates de distância ficam com o menor identificador.
+    """
+
+    def __init__(self, coordenadas: np.ndarray, identificadores: Optional[List[int]] = None, pontos_por_celula: float = 2.0):
+        coordenadas = np.asarray(coordenadas, dtype=np.int64).reshape(-1, 2)
+        if identificadores is None:
+            identificadores = list(range(len(coordenadas)))
+        self._coordenadas: Dict[int, Tuple[int, int]] = {}
+        self.baldes: Dict[Tuple[int, int], List[int]] = {}
+        if len(coordenadas) == 0:
+            self.lado = 1
+            return
+
+        # Células quadradas com, em média, `pontos_por_celula` pontos
+        altura = int(np.ptp(coordenadas[:, 0])) + 1
+        largura = int(np.ptp(coordenadas[:, 1])) + 1
+        self.lado = max(1, int((altura * largura * pontos_por_celula / len(coordenadas)) ** 0.5))
+        for p, (linha, coluna) in zip(identificadores, coordenadas.tolist()):
+            self._coordenadas[p] = (linha, coluna)
+            self.baldes.setdefault(self.celula(linha, coluna), []).append(p)
+
+    def celula(self, linha: int, coluna: int) -> Tuple[int, int]:
+        return linha // self.lado, coluna // self.lado
+
+    def __len__(self) -> int:
+        return len(self._coordenadas)
+
+    def remover(self, p: int) -> None:
+        linha, coluna = self._coordenadas.pop(p)
+        chave = self.celula(linha, coluna)
+        balde = self.baldes[chave]
+        balde.remove(p)
+        if not balde:
+            del self.baldes[chave]
+
+    def _melhor_do_balde(self, balde: List[int], linha: int, coluna: int, melhor: Tuple[int, int]) -> Tuple[int, int]:
+        for p in balde:
+            l, c = self._coordenadas[p]
+            candidato = (abs(l - linha) + abs(c - coluna), p)
+            if candidato < melhor:
+                melhor = candidato
+        return melhor
+
+    def mais_proximo(self, linha: int, coluna: int) -> Optional[int]:
+        """Ponto restante mais próximo de (linha, coluna), ou None se o índice está vazio"""
+        if not self.baldes:
+            return None
+        cl, cc = self.celula(linha, coluna)
+        melhor = (float('inf'), -1)
+        raio = 0
+        while True:
+            # Um anel maior que o número de baldes ocupados custa mais que varrer todos eles
+            if 8 * raio > len(self.baldes):
+                for balde in self.baldes.values():
+                    melhor = self._melhor_do_balde(balde, linha, coluna, melhor)
+                return melhor[1]
+            if raio == 0:
+                celulas = [(cl, cc)]
+            else:
+                celulas = [(cl - raio, cc + k) for k in range(-raio, raio + 1)]
+                celulas += [(cl + raio, cc + k) for k in range(-raio, raio + 1)]
+                celulas += [(cl + k, cc - raio) for k in range(-raio + 1, raio)]
+                celulas += [(cl + k, cc + raio) for k in range(-raio + 1, raio)]
+            for chave in celulas:
+                balde = self.baldes.get(chave)
+                if balde:
+                    melhor = self._melhor_do_balde(balde, linha, coluna, melhor)
+            # Qualquer ponto do próximo anel está a pelo menos raio * lado + 1 da consulta
+            # numa das coordenadas; só um ponto estritamente mais perto poderia vencer
+            if melhor[0] < raio * self.lado + 1:
+                return melhor[1]
+            raio += 1
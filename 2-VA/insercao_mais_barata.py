@@ -0,0 +1,48 @@
+import time
+import numpy as np
+from typing import List, Optional
+
+from distancias import construir_tabela
+from forca_bruta import ler_matriz, encontrar_pontos
+
+
+def rota_insercao_mais_barata(matriz: np.ndarray, prazo: Optional[float] = None) -> Optional[List[int]]:
+    """Constrói a rota pela inserção mais barata, com a origem no índice 0.
+
+    Parte do ciclo R -> ponto mais distante -> R e, a cada passo, insere o ponto
+    restante cujo acréscimo de custo d(i, u) + d(u, j) - d(i, j) é o menor entre todas
+    as arestas (i, j) do ciclo. Retorna a rota sem a origem, ou None se `prazo` (um
+    instante de time.perf_counter()) chegar antes de ela ficar pronta.
+    """
+    n = len(matriz)
+    if n <= 1:
+        return []
+    ciclo = [0, int(np.argmax(matriz[0]))]
+    restantes = np.ones(n, dtype=bool)
+    restantes[ciclo] = False
+
+    while restantes.any():
+        if prazo is not None and time.perf_counter() >= prazo:
+            return None
+        candidatos = np.nonzero(restantes)[0]
+        origens = np.array(ciclo)
+        destinos = np.roll(origens, -1)
+        # acrescimo[e, u]: custo de inserir o candidato u na aresta e do ciclo
+        acrescimo = matriz[origens][:, candidatos] + matriz[destinos][:, candidatos] - matriz[origens, destinos][:, None]
+        aresta, k = np.unravel_index(int(np.argmin(acrescimo)), acrescimo.shape)
+        ciclo.insert(int(aresta) + 1, int(candidatos[k]))
+        restantes[candidatos[k]] = False
+
+    return ciclo[1:]
+
+
+def main():
+    matriz = ler_matriz()
+    pontos = encontrar_pontos(matriz)
+    tabela = construir_tabela(pontos['R'], pontos)
+    rota = rota_insercao_mais_barata(tabela.matriz)
+    print("Sequência de entrega:", " ".join(tabela.para_rotulos(rota)))
+
+
+if __name__ == "__main__":
+    main()
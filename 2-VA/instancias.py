@@ -0,0 +1,125 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from entrada import MatrizEsparsa
+
+# Instâncias guardadas só como vetores de coordenadas e rótulos. O gerador sorteia as
+# k células ocupadas direto (com descarte de repetidas), sem montar a grade, então
+# uma cidade 10.000 x 10.000 custa o mesmo que uma 100 x 100 com o mesmo k.
+
+DISTRIBUICOES = ('uniforme', 'agrupada', 'pontos_quentes')
+
+
+def gerar_rotulos(n: int) -> List[str]:
+    """Rótulos no estilo das colunas de planilha: A, B, ..., Z, AA, AB, ...
+
+    'R' é pulado, porque é o rótulo da origem.
+    """
+    rotulos = []
+    i = 0
+    while len(rotulos) < n:
+        r = ''
+        temp = i
+        while True:
+            r = chr(65 + temp % 26) + r
+            temp = temp // 26 - 1
+            if temp < 0:
+                break
+        if r != 'R':
+            rotulos.append(r)
+        i += 1
+    return rotulos
+
+
+@dataclass
+class Instancia:
+    """Grade L x C com a origem R em coordenadas[0] e as entregas rotulos[i] em coordenadas[i + 1]"""
+    linhas: int
+    colunas: int
+    rotulos: List[str]
+    coordenadas: np.ndarray  # (k + 1, 2), int64
+
+    @property
+    def origem(self) -> Tuple[int, int]:
+        return int(self.coordenadas[0, 0]), int(self.coordenadas[0, 1])
+
+    def pontos(self) -> Dict[str, Tuple[int, int]]:
+        """Dicionário rótulo -> (linha, coluna), com 'R', como o de encontrar_pontos"""
+        return dict(zip(['R'] + self.rotulos, map(tuple, self.coordenadas.tolist())))
+
+    def para_matriz(self) -> MatrizEsparsa:
+        return MatrizEsparsa(self.linhas, self.colunas, self.pontos())
+
+    def para_texto(self) -> str:
+        """Texto no formato esparso, aceito por todos os leitores de matriz"""
+        return self.para_matriz().para_texto()
+
+
+def _sortear_celulas(rng: np.random.Generator, linhas: int, colunas: int, quantidade: int, sortear_lote, proibidas: np.ndarray) -> np.ndarray:
+    """Junta células distintas (índices lineares) de lotes de `sortear_lote` até ter a quantidade pedida.
+
+    A ordem do primeiro sorteio de cada célula é mantida, então a mesma semente gera a
+    mesma instância. Se a distribuição repetir demais, o restante vem uniforme.
+    """
+    escolhidas = np.empty(0, dtype=np.int64)
+    for tentativa in range(64):
+        faltam = quantidade - len(escolhidas)
+        if faltam <= 0:
+            break
+        lote = sortear_lote(faltam + faltam // 4 + 16) if tentativa < 32 else rng.integers(0, linhas * colunas, faltam + faltam // 4 + 16)
+        candidatas = np.concatenate([escolhidas, lote])
+        _, primeira = np.unique(candidatas, return_index=True)
+        candidatas = candidatas[np.sort(primeira)]
+        escolhidas = candidatas[~np.isin(candidatas, proibidas)]
+    if len(escolhidas) < quantidade:
+        raise ValueError("Não foi possível sortear células distintas suficientes")
+    return escolhidas[:quantidade]
+
+
+def gerar_instancia(linhas: int, colunas: int, num_pontos: int, distribuicao: str = 'uniforme', semente: Optional[int] = None,
+                    numero_grupos: int = 10, espalhamento: float = 0.03, fracao_quente: float = 0.8) -> Instancia:
+    """Sorteia uma instância com `num_pontos` entregas em células distintas, em O(k).
+
+    - 'uniforme': todas as células têm a mesma chance;
+    - 'agrupada': as entregas se espalham (normal com desvio `espalhamento` x lado da
+      grade) em torno de `numero_grupos` centros uniformes;
+    - 'pontos_quentes': `fracao_quente` das entregas cai em poucos focos bem concentrados
+      (desvio 5x menor) e o restante fica uniforme pela cidade.
+
+    A origem R é sempre uniforme.
+    """
+    if num_pontos + 1 > linhas * colunas:
+        raise ValueError(f"Uma grade {linhas}x{colunas} não comporta {num_pontos} entregas e a origem")
+    if distribuicao not in DISTRIBUICOES:
+        raise ValueError(f"Distribuição desconhecida: {distribuicao}")
+    rng = np.random.default_rng(semente)
+    origem = rng.integers(0, linhas * colunas, 1)
+
+    def uniforme(quantidade: int) -> np.ndarray:
+        return rng.integers(0, linhas * colunas, quantidade)
+
+    def em_torno(centros: np.ndarray, desvio: float, quantidade: int) -> np.ndarray:
+        escolhidos = centros[rng.integers(0, len(centros), quantidade)]
+        desvios = np.array([desvio * linhas, desvio * colunas])
+        posicoes = np.rint(escolhidos + rng.normal(0.0, 1.0, (quantidade, 2)) * desvios).astype(np.int64)
+        posicoes[:, 0] = np.clip(posicoes[:, 0], 0, linhas - 1)
+        posicoes[:, 1] = np.clip(posicoes[:, 1], 0, colunas - 1)
+        return posicoes[:, 0] * colunas + posicoes[:, 1]
+
+    if distribuicao == 'uniforme':
+        sortear_lote = uniforme
+    else:
+        centros = np.column_stack([rng.integers(0, linhas, numero_grupos), rng.integers(0, colunas, numero_grupos)])
+        if distribuicao == 'agrupada':
+            def sortear_lote(quantidade: int) -> np.ndarray:
+                return em_torno(centros, espalhamento, quantidade)
+        else:
+            def sortear_lote(quantidade: int) -> np.ndarray:
+                quentes = rng.random(quantidade) < fracao_quente
+                return np.where(quentes, em_torno(centros, espalhamento / 5, quantidade), uniforme(quantidade))
+
+    celulas = _sortear_celulas(rng, linhas, colunas, num_pontos, sortear_lote, origem)
+    celulas = np.concatenate([origem, celulas])
+    coordenadas = np.column_stack(np.divmod(celulas, colunas)).astype(np.int64)
+    return Instancia(linhas, colunas, gerar_rotulos(num_pontos), coordenadas)
@@ -0,0 +1,289 @@
+import time
+import numpy as np
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from curva_hilbert import rota_curva_hilbert
+from distancias import coordenadas_pontos
+from forca_bruta import ler_matriz, encontrar_pontos
+
+# Busca de profundidade variável para instâncias grandes (centenas a milhares de
+# entregas). Nada aqui monta a matriz n x n: as distâncias Manhattan saem direto das
+# coordenadas, e cada ponto só é ligado aos seus k vizinhos mais próximos.
+
+
+def vizinhos_manhattan(coordenadas: np.ndarray, k: int, bloco: int = 512) -> List[List[int]]:
+    """k vizinhos mais próximos de cada ponto, em ordem de distância (empates pelo índice).
+
+    As distâncias são calculadas em blocos de linhas, sem guardar a matriz inteira.
+    """
+    n = len(coordenadas)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+    linhas, colunas = coordenadas[:, 0], coordenadas[:, 1]
+    vizinhos: List[List[int]] = []
+    for inicio in range(0, n, bloco):
+        fim = min(inicio + bloco, n)
+        d = np.abs(linhas[inicio:fim, None] - linhas[None, :]) + np.abs(colunas[inicio:fim, None] - colunas[None, :])
+        d[np.arange(fim - inicio), np.arange(inicio, fim)] = np.iinfo(d.dtype).max
+        candidatos = np.argpartition(d, k - 1, axis=1)[:, :k]
+        ordem = np.lexsort((candidatos, np.take_along_axis(d, candidatos, axis=1)))
+        vizinhos.extend(np.take_along_axis(candidatos, ordem, axis=1).tolist())
+    return vizinhos
+
+
+def rota_gulosa(coordenadas: np.ndarray, vizinhos: List[List[int]]) -> List[int]:
+    """Ciclo inicial pela heurística das arestas gulosas (greedy edge).
+
+    As arestas candidatas são aceitas da mais curta para a mais longa enquanto nenhum
+    ponto passa de grau 2 e nenhum ciclo se fecha; os fragmentos que sobram são
+    encadeados pelo extremo livre mais próximo. Retorna o ciclo começando na origem.
+    """
+    n = len(coordenadas)
+    linhas, colunas = coordenadas[:, 0].tolist(), coordenadas[:, 1].tolist()
+    arestas = sorted({
+        (abs(linhas[i] - linhas[j]) + abs(colunas[i] - colunas[j]), min(i, j), max(i, j))
+        for i in range(n) for j in vizinhos[i]
+    })
+
+    pai = list(range(n))
+
+    def raiz(x: int) -> int:
+        while pai[x] != x:
+            pai[x] = pai[pai[x]]
+            x = pai[x]
+        return x
+
+    ligacoes: List[List[int]] = [[] for _ in range(n)]
+    for _, i, j in arestas:
+        if len(ligacoes[i]) < 2 and len(ligacoes[j]) < 2:
+            ri, rj = raiz(i), raiz(j)
+            if ri != rj:
+                pai[ri] = rj
+                ligacoes[i].append(j)
+                ligacoes[j].append(i)
+
+    # Extremos dos fragmentos (um ponto isolado é os dois extremos do seu fragmento)
+    extremos = np.array([p for p in range(n) if len(ligacoes[p]) < 2], dtype=np.int64)
+    livre = np.ones(len(extremos), dtype=bool)
+    indice_extremo = {int(p): i for i, p in enumerate(extremos)}
+
+    def percorrer(extremo: int) -> None:
+        anterior, atual = -1, extremo
+        while True:
+            ciclo.append(atual)
+            if atual in indice_extremo:
+                livre[indice_extremo[atual]] = False
+            seguintes = [p for p in ligacoes[atual] if p != anterior]
+            if not seguintes or (atual != extremo and len(ligacoes[atual]) < 2):
+                return
+            anterior, atual = atual, seguintes[0]
+
+    ciclo: List[int] = []
+    # O fragmento da origem é percorrido a partir de um dos seus extremos
+    anterior, atual = -1, 0
+    while len(ligacoes[atual]) == 2:
+        seguinte = ligacoes[atual][0] if ligacoes[atual][0] != anterior else ligacoes[atual][1]
+        anterior, atual = atual, seguinte
+        if atual == 0:
+            break
+    percorrer(atual)
+    while livre.any():
+        ultimo = ciclo[-1]
+        candidatos = np.flatnonzero(livre)
+        pontos = extremos[candidatos]
+        d = np.abs(coordenadas[pontos, 0] - linhas[ultimo]) + np.abs(coordenadas[pontos, 1] - colunas[ultimo])
+        percorrer(int(pontos[int(d.argmin())]))
+
+    inicio = ciclo.index(0)
+    return ciclo[inicio:] + ciclo[:inicio]
+
+
+class _Percurso:
+    """Ciclo guardado num vetor, com a posição de cada ponto para consultas O(1).
+
+    Uma inversão pode trocar o trecho pelo seu complemento (o ciclo resultante é o
+    mesmo), então sempre percorre o lado mais curto.
+    """
+
+    def __init__(self, pontos: List[int]):
+        self.pontos = list(pontos)
+        self.n = len(pontos)
+        self.posicao = [0] * self.n
+        for i, p in enumerate(self.pontos):
+            self.posicao[p] = i
+
+    def seguinte(self, p: int) -> int:
+        i = self.posicao[p] + 1
+        return self.pontos[i if i < self.n else 0]
+
+    def anterior(self, p: int) -> int:
+        return self.pontos[self.posicao[p] - 1]
+
+    def inverter(self, a: int, b: int) -> None:
+        """Inverte o trecho que vai de a até b no sentido do vetor"""
+        n = self.n
+        i, j = self.posicao[a], self.posicao[b]
+        tamanho = (j - i) % n + 1
+        if 2 * tamanho > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            tamanho = n - tamanho
+        pontos, posicao = self.pontos, self.posicao
+        for _ in range(tamanho // 2):
+            x, y = pontos[i], pontos[j]
+            pontos[i], pontos[j] = y, x
+            posicao[y], posicao[x] = i, j
+            i = i + 1 if i + 1 < n else 0
+            j = j - 1 if j > 0 else n - 1
+
+    def inverter_entre(self, fora: int, a: int, b: int) -> None:
+        """Inverte o caminho de a até b que começa ao lado de `fora` e não passa por ele"""
+        if self.seguinte(fora) == a:
+            self.inverter(a, b)
+        else:
+            self.inverter(b, a)
+
+    def rota(self) -> List[int]:
+        """Entregas na ordem do ciclo, começando logo depois da origem"""
+        inicio = self.posicao[0]
+        return self.pontos[inicio + 1:] + self.pontos[:inicio]
+
+
+def lin_kernighan(coordenadas: np.ndarray, ciclo: List[int], vizinhos: List[List[int]], profundidade: int = 8, largura: Tuple[int, ...] = (5, 3), tempo_limite_ms: Optional[int] = None) -> List[int]:
+    """Melhora o ciclo com passos de Lin-Kernighan e movimentos Or-opt.
+
+    Cada passo do LK remove a aresta (t1, t2), liga t2 a um vizinho t3 e desfaz a
+    aresta (t3, t4), o que equivale a inverter o caminho t2..t4; enquanto o ganho
+    parcial for positivo a cadeia pode continuar até `profundidade` passos, testando
+    `largura[i]` alternativas no nível i (uma só nos níveis seguintes). Os pontos só
+    voltam a ser examinados quando uma aresta sua muda (don't-look bits). Retorna as
+    entregas na ordem da rota, sem a origem.
+    """
+    n = len(ciclo)
+    if n < 5:
+        return ciclo[1:]
+    linhas, colunas = coordenadas[:, 0].tolist(), coordenadas[:, 1].tolist()
+
+    def d(a: int, b: int) -> int:
+        return abs(linhas[a] - linhas[b]) + abs(colunas[a] - colunas[b])
+
+    percurso = _Percurso(ciclo)
+    seguinte, anterior = percurso.seguinte, percurso.anterior
+    tocados: List[int] = []
+
+    def passo_lk(t1: int, t2: int, ganho: int, nivel: int, usados: set) -> int:
+        # Estado: o ciclo tem a aresta (t1, t2), e `ganho` já desconta a sua remoção
+        frente = seguinte(t1) == t2
+        opcoes = []
+        for t3 in vizinhos[t2]:
+            g = ganho - d(t2, t3)
+            if g <= 0:
+                break
+            if t3 == t1 or t3 in usados:
+                continue
+            t4 = anterior(t3) if frente else seguinte(t3)
+            if t4 == t2:
+                continue
+            opcoes.append((d(t3, t4) - d(t2, t3), t3, t4))
+        opcoes.sort(reverse=True)
+
+        for _, t3, t4 in opcoes[:largura[nivel] if nivel < len(largura) else 1]:
+            novo_ganho = ganho - d(t2, t3) + d(t3, t4)
+            percurso.inverter_entre(t1, t2, t4)
+            if novo_ganho - d(t4, t1) > 0:
+                tocados.extend((t2, t3, t4))
+                return novo_ganho - d(t4, t1)
+            if nivel + 1 < profundidade:
+                usados.add(t3)
+                melhora = passo_lk(t1, t4, novo_ganho, nivel + 1, usados)
+                usados.discard(t3)
+                if melhora:
+                    tocados.extend((t2, t3, t4))
+                    return melhora
+            percurso.inverter_entre(t1, t4, t2)
+        return 0
+
+    def or_opt(a: int) -> int:
+        # Move o trecho de 1 a 3 pontos que começa em a para entre dois pontos vizinhos
+        for frente in (True, False):
+            proximo, previo = (seguinte, anterior) if frente else (anterior, seguinte)
+            trecho = [a]
+            for tamanho in (1, 2, 3):
+                if tamanho > 1:
+                    trecho.append(proximo(trecho[-1]))
+                if tamanho > n - 3:
+                    break
+                s1, s2 = trecho[0], trecho[-1]
+                p, q = previo(s1), proximo(s2)
+                remocao = d(p, s1) + d(s2, q) - d(p, q)
+                for ponta in (s1, s2):
+                    for c in vizinhos[ponta]:
+                        if d(ponta, c) >= remocao:
+                            break
+                        if c in trecho:
+                            continue
+                        for x, y in ((c, proximo(c)), (previo(c), c)):
+                            if x in trecho or y in trecho:
+                                continue
+                            direto = d(x, s1) + d(s2, y)
+                            invertido = d(x, s2) + d(s1, y)
+                            delta = min(direto, invertido) - d(x, y) - remocao
+                            if delta < 0:
+                                # p s1..s2 q .. x y  ->  p q .. x s2..s1 y  (e, se preciso, x s1..s2 y)
+                                percurso.inverter_entre(p, s1, x)
+                                percurso.inverter_entre(p, x, q)
+                                if direto < invertido:
+                                    percurso.inverter_entre(x, s2, s1)
+                                tocados.extend((p, q, x, y, s1, s2))
+                                return -delta
+        return 0
+
+    prazo = time.perf_counter() + tempo_limite_ms / 1000 if tempo_limite_ms is not None else None
+    ativos = deque(ciclo)
+    na_fila = [True] * n
+    while ativos:
+        if prazo is not None and time.perf_counter() >= prazo:
+            break
+        t1 = ativos.popleft()
+        na_fila[t1] = False
+        del tocados[:]
+        melhora = passo_lk(t1, seguinte(t1), d(t1, seguinte(t1)), 0, set()) or passo_lk(t1, anterior(t1), d(t1, anterior(t1)), 0, set()) or or_opt(t1)
+        if melhora:
+            for p in [t1] + tocados:
+                if not na_fila[p]:
+                    na_fila[p] = True
+                    ativos.append(p)
+    return percurso.rota()
+
+
+def resolver_lin_kernighan(posicoes: Dict[str, Tuple[int, int]], numero_vizinhos: int = 8, tempo_limite_ms: Optional[int] = None, rota_inicial: str = 'gulosa') -> Tuple[List[str], int]:
+    """Rota inicial ('gulosa' ou 'hilbert') refinada por Lin-Kernighan/Or-opt; retorna a rota e o custo"""
+    rotulos, coordenadas = coordenadas_pontos(posicoes)
+    vizinhos = vizinhos_manhattan(coordenadas, numero_vizinhos)
+    if rota_inicial == 'gulosa':
+        ciclo = rota_gulosa(coordenadas, vizinhos)
+    elif rota_inicial == 'hilbert':
+        ciclo = [0] + rota_curva_hilbert(coordenadas)
+    else:
+        raise ValueError(f"Rota inicial desconhecida: {rota_inicial}")
+    rota = lin_kernighan(coordenadas, ciclo, vizinhos, tempo_limite_ms=tempo_limite_ms)
+    return [rotulos[i - 1] for i in rota], custo_rota(coordenadas, rota)
+
+
+def custo_rota(coordenadas: np.ndarray, rota: List[int]) -> int:
+    """Custo Manhattan da rota (em índices), saindo e voltando para a origem"""
+    pontos = coordenadas[[0] + list(rota) + [0]]
+    return int(np.abs(np.diff(pontos, axis=0)).sum())
+
+
+def main():
+    matriz = ler_matriz()
+    posicoes = encontrar_pontos(matriz)
+    rota, custo = resolver_lin_kernighan(posicoes)
+    print("Melhor rota encontrada:", " ".join(rota))
+    print(f"Custo total: {custo} dronômetros")
+
+
+if __name__ == "__main__":
+    main()
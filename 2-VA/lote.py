@@ -0,0 +1,157 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+
+from entrada import MatrizEsparsa, ler_texto
+from flyfood_main import MOTORES, calcular_custo_rota, plano_fixo, resolver
+from modelo_custo import ModeloCusto, carregar_modelo, planejar
+
+# Modo em lote: lê uma instância por linha de um arquivo JSONL (ou da entrada padrão),
+# resolve em um pool de processos e escreve um resultado JSON por linha. Importações e
+# modelo de custo são carregados uma vez por processo, não uma vez por rota.
+#
+# Cada linha de entrada é um objeto com a instância em um destes campos:
+#   {"id": "rota-1", "matriz": "3 4\n0 0 0 A\n0 R 0 0\nB 0 0 0"}   (qualquer formato de entrada.py)
+#   {"id": "rota-2", "pontos": {"R": [1, 1], "A": [0, 3], "B": [2, 0]}}
+# e, opcionalmente, "tempo_limite_ms" e "motor", que substituem os do lote.
+#
+# Cada linha de saída traz "indice" (linha da instância na entrada, a partir de 0), "id",
+# "motor", "rota", "custo" e "tempos" em ms; ou "erro", se a instância falhou.
+
+# Estado de cada processo do pool, enviado uma única vez na sua criação
+_modelo: Optional[ModeloCusto] = None
+_tempo_limite_ms: Optional[int] = None
+_motor = 'auto'
+
+
+def _inicializar_processo(modelo: ModeloCusto, tempo_limite_ms: Optional[int], motor: str) -> None:
+    global _modelo, _tempo_limite_ms, _motor
+    _modelo = modelo
+    _tempo_limite_ms = tempo_limite_ms
+    _motor = motor
+
+
+def ler_instancia(registro: dict) -> MatrizEsparsa:
+    """Matriz da instância descrita por um registro do lote"""
+    if 'matriz' in registro:
+        return ler_texto(registro['matriz'])
+    if 'pontos' in registro:
+        pontos = {rotulo: (int(posicao[0]), int(posicao[1])) for rotulo, posicao in registro['pontos'].items()}
+        linhas = registro.get('linhas', max((i for i, _ in pontos.values()), default=-1) + 1)
+        colunas = registro.get('colunas', max((j for _, j in pontos.values()), default=-1) + 1)
+        return MatrizEsparsa(linhas, colunas, pontos)
+    raise ValueError("A instância precisa do campo 'matriz' ou 'pontos'")
+
+
+def resolver_registro(tarefa: Tuple[int, bytes]) -> dict:
+    """Resolve uma linha do lote; erros viram um resultado com o campo 'erro'"""
+    indice, linha = tarefa
+    resultado = {'indice': indice, 'id': None}
+    inicio = time.perf_counter()
+    try:
+        registro = json.loads(linha)
+        resultado['id'] = registro.get('id')
+        matriz = ler_instancia(registro)
+        pontos = matriz.pontos
+        if 'R' not in pontos:
+            raise ValueError("Ponto de partida 'R' não encontrado na matriz")
+        lido = time.perf_counter()
+
+        tempo_limite_ms = registro.get('tempo_limite_ms', _tempo_limite_ms)
+        motor = registro.get('motor', _motor)
+        if motor == 'auto':
+            plano = planejar(len(pontos) - 1, tempo_limite_ms, _modelo)
+        else:
+            plano = plano_fixo(motor, tempo_limite_ms)
+        planejado = time.perf_counter()
+
+        # Os processos do pool (e os do servidor) são daemon e não podem criar outro pool:
+        # a força bruta roda em série, e o paralelismo fica entre as instâncias
+        rota = resolver(plano, matriz, processos=1)
+        resolvido = time.perf_counter()
+    except Exception as erro:
+        resultado['erro'] = f"{type(erro).__name__}: {erro}"
+        return resultado
+
+    resultado.update(
+        motor=plano.motor,
+        rota=rota,
+        custo=calcular_custo_rota(pontos['R'], pontos, rota),
+        tempos=dict(
+            leitura_ms=round((lido - inicio) * 1000, 3),
+            planejamento_ms=round((planejado - lido) * 1000, 3),
+            resolucao_ms=round((resolvido - planejado) * 1000, 3),
+            total_ms=round((resolvido - inicio) * 1000, 3),
+        ),
+    )
+    return resultado
+
+
+def _tarefas(linhas: Iterable[bytes]) -> Iterator[Tuple[int, bytes]]:
+    # Linhas em branco não contam como instâncias
+    indice = 0
+    for linha in linhas:
+        if linha.strip():
+            yield indice, linha
+            indice += 1
+
+
+def resolver_lote(linhas: Iterable[bytes], processos: Optional[int] = None, ordem: str = 'entrada', tempo_limite_ms: Optional[int] = None,
+                  motor: str = 'auto', tamanho_bloco: int = 1, modelo: Optional[ModeloCusto] = None) -> Iterator[dict]:
+    """Resolve as instâncias das linhas JSONL e produz os resultados à medida que ficam prontos.
+
+    `ordem` é 'entrada' (resultados na ordem das linhas) ou 'conclusao' (na ordem em
+    que terminam, o que evita que uma instância lenta segure as outras). processos=None
+    usa todos os núcleos; processos=1 resolve no próprio processo. O modelo de custo é
+    carregado uma vez aqui, antes de criar os processos; sem modelo gravado, a
+    calibração roda neste ponto, antes da primeira instância, e não dentro do orçamento
+    de nenhuma delas.
+    """
+    if ordem not in ('entrada', 'conclusao'):
+        raise ValueError(f"Ordem desconhecida: {ordem}")
+    modelo = modelo or carregar_modelo(calibrar_se_ausente=True)
+    argumentos = (modelo, tempo_limite_ms, motor)
+    if processos == 1:
+        _inicializar_processo(*argumentos)
+        yield from map(resolver_registro, _tarefas(linhas))
+        return
+    with multiprocessing.Pool(processos, initializer=_inicializar_processo, initargs=argumentos) as pool:
+        mapear = pool.imap if ordem == 'entrada' else pool.imap_unordered
+        yield from mapear(resolver_registro, _tarefas(linhas), chunksize=tamanho_bloco)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FlyFood em lote: instâncias em JSONL, uma rota por linha de saída")
+    parser.add_argument('entrada', nargs='?', default='-', help="arquivo JSONL de instâncias ('-' para a entrada padrão)")
+    parser.add_argument('-o', '--saida', default='-', help="arquivo JSONL de resultados ('-' para a saída padrão)")
+    parser.add_argument('--processos', type=int, default=None, help="processos do pool (padrão: todos os núcleos)")
+    parser.add_argument('--ordem', choices=['entrada', 'conclusao'], default='entrada', help="ordem dos resultados na saída")
+    parser.add_argument('--tempo-limite-ms', type=int, default=None, help="orçamento de tempo de cada instância")
+    parser.add_argument('--motor', choices=['auto', *MOTORES], default='auto', help="algoritmo usado em todas as instâncias")
+    parser.add_argument('--tamanho-bloco', type=int, default=1, help="instâncias enviadas de cada vez a um processo")
+    parser.add_argument('--calibrar', action='store_true', help="refaz o micro-benchmark do modelo de custo antes do lote")
+    argumentos = parser.parse_args()
+    modelo = carregar_modelo(recalibrar=argumentos.calibrar, calibrar_se_ausente=True)
+
+    entrada = sys.stdin.buffer if argumentos.entrada == '-' else open(argumentos.entrada, 'rb')
+    saida = sys.stdout if argumentos.saida == '-' else open(argumentos.saida, 'w', encoding='utf-8')
+    inicio = time.perf_counter()
+    total = erros = 0
+    try:
+        for resultado in resolver_lote(entrada, argumentos.processos, argumentos.ordem, argumentos.tempo_limite_ms, argumentos.motor, argumentos.tamanho_bloco, modelo):
+            saida.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+            total += 1
+            erros += 'erro' in resultado
+    finally:
+        if entrada is not sys.stdin.buffer:
+            entrada.close()
+        if saida is not sys.stdout:
+            saida.close()
+    print(f"{total} instâncias ({erros} com erro) em {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
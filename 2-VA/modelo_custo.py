@@ -0,0 +1,258 @@
+import json
+import math
+import os
+import platform
+import time
+import numpy as np
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, Optional
+
+from algoritmo_genetico import FRACAO_PRAZO_SEMENTES
+from distancias import construir_tabela
+from instancias import gerar_instancia
+
+# Modelo de custo dos motores: cada um tem uma fórmula de tempo em função do número de
+# entregas n, com constantes medidas por um micro-benchmark na própria máquina e
+# guardadas em disco. O despachante usa as estimativas para escolher o motor e os
+# parâmetros que cabem no orçamento de tempo de quem chamou.
+
+VERSAO_MODELO = 3
+# Pode ser trocado pela variável FLYFOOD_MODELO_CUSTO
+ARQUIVO_MODELO = os.path.join(os.path.expanduser('~'), '.cache', 'flyfood', 'modelo_custo.json')
+
+# Orçamento usado quando quem chama não informa um
+ORCAMENTO_PADRAO_MS = 10_000
+# Parte do orçamento que as estimativas podem ocupar; o resto cobre erros do modelo
+FOLGA = 0.8
+# Acima deste número de entregas a força bruta nem é considerada
+LIMITE_FORCA_BRUTA = 12
+# Acima deste número de entregas o Held-Karp passa a pesar demais na memória (2^n x n)
+LIMITE_HELD_KARP = 20
+# A partir deste número de entregas o AG fica lento e longe do ótimo
+LIMITE_LIN_KERNIGHAN = 500
+# Configurações do AG tentadas, da maior para a menor população
+POPULACOES_AG = (150, 100, 50)
+MAXIMO_GERACOES_AG = 1000
+MINIMO_GERACOES_AG = 100
+# Parte da população inicial do AG semeada por heurísticas construtivas
+FRACAO_SEMENTES_AG = 0.1
+
+
+@dataclass
+class ModeloCusto:
+    """Constantes, em milissegundos, das fórmulas de tempo de cada motor"""
+    forca_bruta: float = 5e-5            # por permutação (n!)
+    held_karp: float = 2e-5              # por mascara x entrada x entrada (2^n n²)
+    ag_inicial: float = 0.05             # por entrega, leitura e população inicial aleatória
+    ag_semente: float = 3e-5             # por semente gulosa x entrega x entrega
+    ag_insercao: float = 1e-6            # por entrega³, semente da inserção mais barata
+    ag_geracao: float = 1e-4             # por indivíduo x entrega, a cada geração
+    ag_geracao_fixo: float = 0.1         # por geração
+    lin_kernighan_inicial: float = 0.02  # por entrega, rota gulosa
+    lin_kernighan_vizinhos: float = 2e-5 # por par de entregas, listas de vizinhos
+    lin_kernighan: float = 0.15          # por entrega, melhoria da rota inicial
+    hilbert: float = 1e-3                # por entrega
+    maquina: str = ''
+    versao: int = VERSAO_MODELO
+
+    def estimar(self, motor: str, n: int, tamanho_populacao: int = 150, numero_geracoes: int = MAXIMO_GERACOES_AG) -> float:
+        """Tempo estimado, em ms, do motor numa instância com n entregas"""
+        if motor == 'forca_bruta':
+            return self.forca_bruta * math.factorial(n)
+        if motor == 'held_karp':
+            return self.held_karp * (2 ** n) * n * n
+        if motor == 'ag':
+            return self.inicial_ag(n, tamanho_populacao) + numero_geracoes * self.geracao_ag(n, tamanho_populacao)
+        if motor == 'lin_kernighan':
+            return self.inicial_lin_kernighan(n) + self.lin_kernighan * n
+        if motor == 'hilbert':
+            return self.hilbert * n
+        raise ValueError(f"Motor desconhecido: {motor}")
+
+    def inicial_ag(self, n: int, tamanho_populacao: int, orcamento_ms: Optional[float] = None) -> float:
+        # As sementes gulosas são quadráticas e a inserção mais barata é cúbica; com
+        # orçamento, o AG não deixa as sementes passarem de FRACAO_PRAZO_SEMENTES dele
+        sementes = round(FRACAO_SEMENTES_AG * tamanho_populacao)
+        tempo_sementes = self.ag_semente * sementes * n * n + (self.ag_insercao * n ** 3 if sementes > 1 else 0.0)
+        if orcamento_ms is not None:
+            tempo_sementes = min(tempo_sementes, FRACAO_PRAZO_SEMENTES * orcamento_ms)
+        return self.ag_inicial * n + tempo_sementes
+
+    def geracao_ag(self, n: int, tamanho_populacao: int) -> float:
+        return self.ag_geracao_fixo + self.ag_geracao * tamanho_populacao * n
+
+    def inicial_lin_kernighan(self, n: int) -> float:
+        # As listas de vizinhos comparam cada ponto com todos os outros
+        return self.lin_kernighan_inicial * n + self.lin_kernighan_vizinhos * n * n
+
+
+@dataclass
+class Plano:
+    """Motor escolhido, seus parâmetros e o tempo que o modelo espera que ele leve
+    (None quando o motor foi escolhido à mão)"""
+    motor: str
+    estimativa_ms: Optional[float]
+    parametros: Dict[str, Any] = field(default_factory=dict)
+
+
+def identificar_maquina() -> str:
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()}/{platform.python_implementation()} {platform.python_version()}"
+
+
+def _cronometrar(funcao, repeticoes: int = 3) -> float:
+    # Menor de algumas medições, em ms: as maiores refletem ruído da máquina
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, (time.perf_counter() - inicio) * 1000)
+    return melhor
+
+
+def calibrar() -> ModeloCusto:
+    """Mede as constantes do modelo com instâncias pequenas (cerca de um segundo no total)"""
+    from algoritmo_genetico import ConfiguracoesAG, FlyFoodAG
+    from curva_hilbert import encontrar_rota_curva_hilbert
+    from forca_bruta import gerar_rotas
+    from held_karp import held_karp
+    from insercao_mais_barata import rota_insercao_mais_barata
+    from lin_kernighan import resolver_lin_kernighan, rota_gulosa, vizinhos_manhattan
+    from vizinho_mais_proximo import rota_mais_proxima_indices
+
+    modelo = ModeloCusto(maquina=identificar_maquina())
+
+    instancia = gerar_instancia(100, 100, 8, semente=0)
+    pontos = instancia.pontos()
+    rotulos = instancia.rotulos
+    modelo.forca_bruta = _cronometrar(lambda: min(custo for custo, _ in gerar_rotas(pontos['R'], pontos, rotulos))) / math.factorial(8)
+
+    instancia = gerar_instancia(100, 100, 13, semente=0)
+    matriz = construir_tabela(instancia.origem, instancia.pontos()).matriz
+    modelo.held_karp = _cronometrar(lambda: held_karp(matriz)) / (2 ** 13 * 13 * 13)
+
+    # AG: as sementes são medidas à parte, as gulosas (metade de cada variação) numa
+    # instância maior e a inserção mais barata numa menor
+    instancia = gerar_instancia(1000, 1000, 400, semente=0)
+    matriz = construir_tabela(instancia.origem, instancia.pontos()).matriz
+    rng = np.random.default_rng(0)
+    gulosas = _cronometrar(lambda: rota_mais_proxima_indices(matriz, primeiro=1)) + _cronometrar(lambda: rota_mais_proxima_indices(matriz, rng, candidatos=3))
+    modelo.ag_semente = gulosas / 2 / (400 * 400)
+    instancia = gerar_instancia(1000, 1000, 200, semente=0)
+    matriz = construir_tabela(instancia.origem, instancia.pontos()).matriz
+    modelo.ag_insercao = _cronometrar(lambda: rota_insercao_mais_barata(matriz)) / 200 ** 3
+
+    # O tempo sem gerações nem sementes é o custo inicial; duas populações separam o
+    # custo fixo de cada geração do que cresce com população x entregas
+    n, geracoes = 60, 30
+    texto = gerar_instancia(100, 100, n, semente=0).para_texto()
+
+    def executar_ag(tamanho_populacao: int, numero_geracoes: int) -> float:
+        configuracoes = ConfiguracoesAG(tamanho_populacao=tamanho_populacao, numero_geracoes=numero_geracoes, semente=0)
+        return _cronometrar(lambda: FlyFoodAG(configuracoes).executar(texto), 2)
+
+    inicial = executar_ag(40, 0)
+    pequena = (executar_ag(40, geracoes) - inicial) / geracoes
+    grande = (executar_ag(160, geracoes) - inicial) / geracoes
+    modelo.ag_inicial = inicial / n
+    modelo.ag_geracao = max(grande - pequena, 1e-6) / (120 * n)
+    modelo.ag_geracao_fixo = max(pequena - modelo.ag_geracao * 40 * n, 0.0)
+
+    # Lin-Kernighan: as listas de vizinhos são quadráticas e medidas numa instância
+    # maior; a rota gulosa e a melhoria, lineares, numa menor
+    coordenadas = gerar_instancia(1000, 1000, 3200, semente=0).coordenadas
+    modelo.lin_kernighan_vizinhos = _cronometrar(lambda: vizinhos_manhattan(coordenadas, 8), 2) / (3200 * 3200)
+    instancia = gerar_instancia(1000, 1000, 800, semente=0)
+    coordenadas = instancia.coordenadas
+    vizinhos = vizinhos_manhattan(coordenadas, 8)
+    modelo.lin_kernighan_inicial = _cronometrar(lambda: rota_gulosa(coordenadas, vizinhos), 2) / 800
+    pontos = instancia.pontos()
+    modelo.lin_kernighan = max(_cronometrar(lambda: resolver_lin_kernighan(pontos), 2) - modelo.inicial_lin_kernighan(800), 0.0) / 800
+
+    n = 20000
+    pontos = gerar_instancia(1000, 1000, n, semente=0).pontos()
+    modelo.hilbert = _cronometrar(lambda: encontrar_rota_curva_hilbert(pontos)) / n
+    return modelo
+
+
+def salvar_modelo(modelo: ModeloCusto, caminho: str) -> None:
+    # Grava num arquivo temporário e renomeia, para nunca deixar um modelo pela metade
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w') as arquivo:
+        json.dump(asdict(modelo), arquivo, indent=2)
+    os.replace(temporario, caminho)
+
+
+def carregar_modelo(caminho: Optional[str] = None, recalibrar: bool = False, calibrar_se_ausente: bool = False) -> ModeloCusto:
+    """Modelo desta máquina, lido do disco.
+
+    Um arquivo de outra máquina ou de outra versão do modelo é descartado. Sem arquivo
+    válido, o modelo é calibrado (e gravado) só se `calibrar_se_ausente` for pedido;
+    senão valem as constantes padrão de ModeloCusto, para que a calibração (cerca de um
+    segundo) nunca caia dentro do orçamento de quem só queria planejar uma rota.
+    `recalibrar` refaz a calibração mesmo com um arquivo válido. Se não for possível
+    gravar o arquivo, o modelo calibrado é usado só nesta execução.
+    """
+    caminho = caminho or os.environ.get('FLYFOOD_MODELO_CUSTO') or ARQUIVO_MODELO
+    if not recalibrar:
+        try:
+            with open(caminho) as arquivo:
+                dados = json.load(arquivo)
+            nomes = {campo.name for campo in fields(ModeloCusto)}
+            modelo = ModeloCusto(**{chave: valor for chave, valor in dados.items() if chave in nomes})
+            if modelo.versao == VERSAO_MODELO and modelo.maquina == identificar_maquina():
+                return modelo
+        except (OSError, ValueError, TypeError):
+            pass
+        if not calibrar_se_ausente:
+            return ModeloCusto()
+    modelo = calibrar()
+    try:
+        salvar_modelo(modelo, caminho)
+    except OSError:
+        pass
+    return modelo
+
+
+def planejar(n: int, orcamento_ms: Optional[float] = None, modelo: Optional[ModeloCusto] = None) -> Plano:
+    """Escolhe o motor e os parâmetros para n entregas dentro de `orcamento_ms`.
+
+    Em ordem de preferência: o método exato mais rápido (força bruta ou Held-Karp) se
+    couber; o AG, abaixo de LIMITE_LIN_KERNIGHAN entregas, com a maior população e o
+    maior número de gerações que couberem; o Lin-Kernighan, com o tempo que sobrar
+    depois de montar a rota inicial; e, por fim, a curva de Hilbert, que é sempre a
+    mais barata. O orçamento só é apertado pela estimativa: o AG e o Lin-Kernighan
+    recebem também o prazo, para pararem a tempo se o modelo errar para menos. Sem
+    `modelo`, usa o gravado em disco ou as constantes padrão; nunca calibra aqui.
+    """
+    modelo = modelo or carregar_modelo()
+    orcamento_ms = ORCAMENTO_PADRAO_MS if orcamento_ms is None else orcamento_ms
+    disponivel = orcamento_ms * FOLGA
+
+    exatos = []
+    if n <= LIMITE_FORCA_BRUTA:
+        exatos.append(Plano('forca_bruta', modelo.estimar('forca_bruta', n)))
+    if n <= LIMITE_HELD_KARP:
+        exatos.append(Plano('held_karp', modelo.estimar('held_karp', n)))
+    if exatos:
+        exato = min(exatos, key=lambda plano: plano.estimativa_ms)
+        if exato.estimativa_ms <= disponivel:
+            return exato
+
+    if n < LIMITE_LIN_KERNIGHAN:
+        for tamanho_populacao in POPULACOES_AG:
+            inicial = modelo.inicial_ag(n, tamanho_populacao, disponivel)
+            numero_geracoes = min(MAXIMO_GERACOES_AG, int((disponivel - inicial) / modelo.geracao_ag(n, tamanho_populacao)))
+            if numero_geracoes >= MINIMO_GERACOES_AG:
+                # O prazo do AG conta desde a leitura da instância, então ele recebe a parte
+                # do orçamento reservada às estimativas, e não o orçamento inteiro
+                parametros = dict(tamanho_populacao=tamanho_populacao, numero_geracoes=numero_geracoes, fracao_sementes=FRACAO_SEMENTES_AG,
+                                  paciencia=max(50, numero_geracoes // 5), tempo_limite_ms=max(1, int(disponivel)))
+                return Plano('ag', inicial + numero_geracoes * modelo.geracao_ag(n, tamanho_populacao), parametros)
+
+    inicial = modelo.inicial_lin_kernighan(n)
+    if inicial <= disponivel:
+        completo = modelo.estimar('lin_kernighan', n)
+        return Plano('lin_kernighan', min(completo, disponivel), dict(tempo_limite_ms=max(1, int(disponivel - inicial))))
+
+    return Plano('hilbert', modelo.estimar('hilbert', n))
@@ -0,0 +1,176 @@
+import numpy as np
+from typing import Tuple
+
+# Operadores em lote sobre populações (P, n) de rotas de índices inteiros. Cada
+# linha é uma permutação dos mesmos valores (na FlyFoodAG, os índices 1..n).
+
+
+def sortear_cortes(rng: np.random.Generator, quantidade: int, tamanho: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorteia, para cada filho, dois pontos de corte distintos a < b (a = b = 0 se tamanho < 2)"""
+    if tamanho < 2:
+        zeros = np.zeros(quantidade, dtype=np.int64)
+        return zeros, zeros.copy()
+    a = rng.integers(0, tamanho, quantidade)
+    b = rng.integers(0, tamanho - 1, quantidade)
+    b += b >= a
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def _preparar(populacao: np.ndarray, pais1: np.ndarray, pais2: np.ndarray, rng: np.random.Generator):
+    p1 = populacao[pais1]
+    p2 = populacao[pais2]
+    quantidade, tamanho = p1.shape
+    a, b = sortear_cortes(rng, quantidade, tamanho)
+    posicoes = np.arange(tamanho)
+    segmento = (posicoes >= a[:, None]) & (posicoes <= b[:, None])
+    return p1, p2, a, b, segmento
+
+
+def crossover_order_lote(populacao: np.ndarray, pais1: np.ndarray, pais2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Order Crossover (OX) de todos os pares (pais1[k], pais2[k]) de uma vez.
+
+    O filho copia o segmento [a, b] do primeiro pai e preenche as demais posições, da
+    esquerda para a direita, com os genes do segundo pai que não estão no segmento.
+    """
+    # Com menos de duas entregas só existe uma rota, e o filho é cópia do primeiro pai
+    if populacao.shape[1] < 2:
+        return populacao[pais1]
+    p1, p2, _, _, segmento = _preparar(populacao, pais1, pais2, rng)
+    linhas = np.arange(len(p1))[:, None]
+
+    # Marca, por valor, quais genes já vieram do segmento do primeiro pai
+    no_segmento = np.zeros((len(p1), int(populacao.max()) + 1), dtype=bool)
+    no_segmento[np.nonzero(segmento)[0], p1[segmento]] = True
+    restantes = ~no_segmento[linhas, p2]
+
+    # Cada linha tem tantas posições livres quanto genes restantes, então a
+    # atribuição por máscara (em ordem de linha) preenche cada filho na ordem de p2
+    filhos = p1.copy()
+    filhos[~segmento] = p2[restantes]
+    return filhos
+
+
+def crossover_pmx_lote(populacao: np.ndarray, pais1: np.ndarray, pais2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Partially Mapped Crossover (PMX) de todos os pares (pais1[k], pais2[k]) de uma vez.
+
+    Fora do segmento, cada gene do segundo pai que colide com o segmento segue o
+    mapeamento p1[i] -> p2[i] até sair dele. A posição de cada valor no primeiro pai
+    vem de um vetor inverso, e só os genes ainda em conflito continuam a ser
+    resolvidos; como as cadeias de mapeamento são disjuntas, cada filho custa O(n).
+    """
+    if populacao.shape[1] < 2:
+        return populacao[pais1]
+    p1, p2, a, b, segmento = _preparar(populacao, pais1, pais2, rng)
+    quantidade, tamanho = p1.shape
+    linhas = np.arange(quantidade)
+
+    posicao_em_p1 = np.empty((quantidade, int(populacao.max()) + 1), dtype=np.intp)
+    posicao_em_p1[linhas[:, None], p1] = np.arange(tamanho)
+
+    filhos = np.where(segmento, p1, p2)
+    linha, coluna = np.nonzero(~segmento)
+    candidatos = p2[linha, coluna]
+    while len(candidatos):
+        posicao = posicao_em_p1[linha, candidatos]
+        conflito = (posicao >= a[linha]) & (posicao <= b[linha])
+        resolvidos = ~conflito
+        filhos[linha[resolvidos], coluna[resolvidos]] = candidatos[resolvidos]
+        linha, coluna = linha[conflito], coluna[conflito]
+        candidatos = p2[linha, posicao[conflito]]
+    return filhos
+
+
+def selecao_torneio(pontuacoes: np.ndarray, quantidade: int, tamanho_torneio: int, rng: np.random.Generator) -> np.ndarray:
+    """Torneio de k competidores: devolve os índices dos vencedores, sem copiar indivíduos"""
+    competidores = rng.integers(0, len(pontuacoes), (quantidade, tamanho_torneio))
+    vencedores = np.argmax(pontuacoes[competidores], axis=1)
+    return competidores[np.arange(quantidade), vencedores]
+
+
+def selecao_roleta(pontuacoes: np.ndarray, quantidade: int, rng: np.random.Generator) -> np.ndarray:
+    """Roleta proporcional ao inverso da distância (as pontuações são distâncias negativas)"""
+    pesos = 1.0 / np.maximum(-pontuacoes.astype(np.float64), 1.0)
+    return rng.choice(len(pontuacoes), quantidade, p=pesos / pesos.sum())
+
+
+# Mutações com avaliação incremental: cada uma altera a rota no lugar e devolve a
+# variação de custo calculada só pelas arestas afetadas. As pontas da rota se ligam
+# à origem R, que é o índice 0 da matriz de distâncias.
+
+def _no(rota: np.ndarray, i: int) -> int:
+    return int(rota[i]) if 0 <= i < len(rota) else 0
+
+
+def troca(rota: np.ndarray, distancias: np.ndarray, i: int, j: int) -> int:
+    """Troca os genes das posições i e j"""
+    if i > j:
+        i, j = j, i
+    x, y = int(rota[i]), int(rota[j])
+    a, b = _no(rota, i - 1), _no(rota, j + 1)
+    d = distancias
+    if j == i + 1:
+        delta = d[a, y] + d[x, b] - d[a, x] - d[y, b]
+    else:
+        c, e = int(rota[i + 1]), int(rota[j - 1])
+        delta = d[a, y] + d[y, c] + d[e, x] + d[x, b] - d[a, x] - d[x, c] - d[e, y] - d[y, b]
+    rota[i], rota[j] = y, x
+    return int(delta)
+
+
+def inversao(rota: np.ndarray, distancias: np.ndarray, i: int, j: int) -> int:
+    """Inverte o trecho [i, j] (movimento 2-opt)"""
+    if i > j:
+        i, j = j, i
+    a, b = _no(rota, i - 1), _no(rota, j + 1)
+    x, y = int(rota[i]), int(rota[j])
+    delta = distancias[a, y] + distancias[x, b] - distancias[a, x] - distancias[y, b]
+    rota[i:j + 1] = rota[i:j + 1][::-1].copy()
+    return int(delta)
+
+
+def or_opt(rota: np.ndarray, distancias: np.ndarray, i: int, tamanho: int, j: int, invertido: bool = False) -> int:
+    """Move o trecho de `tamanho` genes que começa em i para a posição j da rota sem ele"""
+    n = len(rota)
+    primeiro, ultimo = int(rota[i]), int(rota[i + tamanho - 1])
+    p, q = _no(rota, i - 1), _no(rota, i + tamanho)
+
+    # Vizinhos do ponto de inserção na rota sem o trecho
+    def no_reduzido(k: int) -> int:
+        if k < 0 or k >= n - tamanho:
+            return 0
+        return int(rota[k] if k < i else rota[k + tamanho])
+
+    u, v = no_reduzido(j - 1), no_reduzido(j)
+    if invertido:
+        primeiro, ultimo = ultimo, primeiro
+    d = distancias
+    delta = d[p, q] - d[p, int(rota[i])] - d[int(rota[i + tamanho - 1]), q] + d[u, primeiro] + d[ultimo, v] - d[u, v]
+
+    trecho = rota[i:i + tamanho].copy()
+    if invertido:
+        trecho = trecho[::-1]
+    reduzida = np.concatenate([rota[:i], rota[i + tamanho:]])
+    rota[:] = np.concatenate([reduzida[:j], trecho, reduzida[j:]])
+    return int(delta)
+
+
+def insercao(rota: np.ndarray, distancias: np.ndarray, i: int, j: int) -> int:
+    """Remove o gene da posição i e o reinsere na posição j"""
+    return or_opt(rota, distancias, i, 1, j)
+
+
+def mutar_com_delta(rota: np.ndarray, distancias: np.ndarray, metodo: str, rng: np.random.Generator) -> int:
+    """Aplica uma mutação sorteada do tipo `metodo` e devolve a variação de custo"""
+    n = len(rota)
+    if n < 2:
+        return 0
+    if metodo == 'troca' or metodo == 'inversao':
+        i, j = rng.choice(n, 2, replace=False)
+        return troca(rota, distancias, i, j) if metodo == 'troca' else inversao(rota, distancias, i, j)
+    if metodo == 'insercao':
+        return insercao(rota, distancias, int(rng.integers(n)), int(rng.integers(n)))
+    if metodo == 'or_opt':
+        tamanho = int(rng.integers(1, min(3, n - 1) + 1))
+        i, j = rng.integers(0, n - tamanho + 1, 2)
+        return or_opt(rota, distancias, int(i), tamanho, int(j), bool(rng.random() < 0.5))
+    raise ValueError(f"Método de mutação desconhecido: {metodo}")
@@ -0,0 +1,345 @@
+import math
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from algoritmo_genetico import FlyFoodAG, ConfiguracoesAG
+from curva_hilbert import rota_curva_hilbert
+from distancias import TabelaDistancias, construir_tabela
+from vizinho_mais_proximo import rota_mais_proxima_indices
+
+# Uma única rota de índices (1..n, origem R no índice 0 da matriz) percorre o espaço
+# de soluções. Cada movimento é avaliado em O(1) pelas arestas que muda, e só os
+# aceitos pagam o custo de alterar a lista.
+
+# Piso da temperatura, em que só movimentos que não pioram passam (exp(-delta / piso) já
+# é 0.0); nenhuma conta do resfriamento pode levá-la a zero
+TEMPERATURA_MINIMA = 1e-9
+# Pioras guardadas por nível para o resfriamento adaptativo calcular a temperatura
+AMOSTRA_PIORAS = 256
+
+
+@dataclass
+class ConfiguracoesRS:
+    numero_passos: int = 1_000_000
+    tempo_limite_ms: Optional[int] = None
+    resfriamento: str = 'geometrico'  # 'geometrico' ou 'adaptativo'
+    temperatura_inicial: Optional[float] = None  # None estima por uma amostra de movimentos
+    taxa_aceitacao_inicial: float = 0.5  # de movimentos que pioram, no início (define a temperatura inicial estimada)
+    taxa_aceitacao_final: float = 1e-4  # de movimentos que pioram, ao fim do orçamento (define a temperatura final)
+    passos_por_temperatura: Optional[int] = None  # None usa 20 passos por entrega (no mínimo 1000)
+    proporcao_2opt: float = 0.5  # o restante dos movimentos é Or-opt
+    vizinhos_movimentos: Optional[int] = 8  # movimentos ligam um ponto a um dos k vizinhos mais próximos (None sorteia posições quaisquer)
+    paciencia_reaquecimento: Optional[int] = 10  # níveis congelados antes de reaquecer (None desativa)
+    fator_reaquecimento: float = 0.3  # fração da temperatura inicial após reaquecer
+    rota_inicial: str = 'vizinho'  # 'vizinho', 'hilbert' ou 'aleatoria'
+    semente: Optional[int] = None
+
+    def __post_init__(self):
+        if not 0 < self.taxa_aceitacao_inicial < 1:
+            raise ValueError(f"taxa_aceitacao_inicial deve estar entre 0 e 1 (exclusive): {self.taxa_aceitacao_inicial}")
+        if not 0 < self.taxa_aceitacao_final < 1:
+            raise ValueError(f"taxa_aceitacao_final deve estar entre 0 e 1 (exclusive): {self.taxa_aceitacao_final}")
+        if not self.taxa_aceitacao_final < self.taxa_aceitacao_inicial:
+            raise ValueError("taxa_aceitacao_final deve ser menor que taxa_aceitacao_inicial")
+        if not 0 < self.fator_reaquecimento <= 1:
+            raise ValueError(f"fator_reaquecimento deve estar em (0, 1]: {self.fator_reaquecimento}")
+        if self.temperatura_inicial is not None and self.temperatura_inicial <= 0:
+            raise ValueError(f"temperatura_inicial deve ser positiva: {self.temperatura_inicial}")
+
+
+def _no(rota: List[int], k: int) -> int:
+    return rota[k] if 0 <= k < len(rota) else 0
+
+
+def delta_2opt(rota: List[int], d: List[List[int]], i: int, j: int) -> int:
+    """Variação de custo ao inverter o trecho [i, j], com i < j"""
+    a, b = _no(rota, i - 1), _no(rota, j + 1)
+    x, y = rota[i], rota[j]
+    return d[a][y] + d[x][b] - d[a][x] - d[y][b]
+
+
+def delta_or_opt(rota: List[int], d: List[List[int]], i: int, tamanho: int, k: int, invertido: bool) -> int:
+    """Variação de custo ao mover o trecho [i, i + tamanho) para a aresta que entra na
+    posição k (entre k - 1 e k), com k < i ou k > i + tamanho"""
+    s1, s2 = rota[i], rota[i + tamanho - 1]
+    p, q = _no(rota, i - 1), _no(rota, i + tamanho)
+    x, y = _no(rota, k - 1), _no(rota, k)
+    if invertido:
+        s1, s2 = s2, s1
+    return d[p][q] - d[p][rota[i]] - d[rota[i + tamanho - 1]][q] + d[x][s1] + d[s2][y] - d[x][y]
+
+
+def aplicar_2opt(rota: List[int], i: int, j: int) -> Tuple[int, int]:
+    """Aplica o movimento e devolve o intervalo [início, fim) de posições alteradas"""
+    rota[i:j + 1] = rota[i:j + 1][::-1]
+    return i, j + 1
+
+
+def aplicar_or_opt(rota: List[int], i: int, tamanho: int, k: int, invertido: bool) -> Tuple[int, int]:
+    """Aplica o movimento e devolve o intervalo [início, fim) de posições alteradas"""
+    trecho = rota[i:i + tamanho]
+    if invertido:
+        trecho.reverse()
+    if k < i:
+        rota[k:i + tamanho] = trecho + rota[k:i]
+        return k, i + tamanho
+    rota[i:k] = rota[i + tamanho:k] + trecho
+    return i, k
+
+
+def taxa_aceitacao(pioras: List[int], temperatura: float) -> float:
+    """Fração das pioras dadas que o critério de Metropolis aceitaria na temperatura"""
+    return sum(math.exp(-delta / temperatura) for delta in pioras) / len(pioras)
+
+
+def temperatura_para_taxa(pioras: List[int], taxa: float) -> float:
+    """Temperatura em que as pioras dadas seriam aceitas, em média, com a taxa pedida.
+
+    A aceitação média cresce com a temperatura e fica entre a da menor e a da maior
+    piora, então a busca binária (em escala logarítmica) parte desses dois limites.
+    """
+    baixa = min(pioras) / -math.log(taxa)
+    alta = max(pioras) / -math.log(taxa)
+    for _ in range(40):
+        meio = math.sqrt(baixa * alta)
+        if taxa_aceitacao(pioras, meio) < taxa:
+            baixa = meio
+        else:
+            alta = meio
+    return math.sqrt(baixa * alta)
+
+
+class FlyFoodRS:
+    """Recozimento simulado (simulated annealing) com movimentos 2-opt e Or-opt"""
+
+    def __init__(self, configuracoes: Optional[ConfiguracoesRS] = None):
+        self.configuracoes = configuracoes if configuracoes else ConfiguracoesRS()
+        self.rng = np.random.default_rng(self.configuracoes.semente)
+        self.passos = 0
+        self.reaquecimentos = 0
+        self._candidatos: Optional[List[List[int]]] = None
+
+    def sortear_movimento(self, rota: List[int], sorteio: List[float]):
+        """Converte cinco números em [0, 1) num movimento válido e devolve (delta, movimento)"""
+        if self._candidatos is not None and len(rota) >= 3:
+            return self._sortear_movimento_vizinho(rota, sorteio)
+        return self._sortear_movimento_qualquer(rota, sorteio)
+
+    def _sortear_movimento_vizinho(self, rota: List[int], sorteio: List[float]):
+        """Movimento que liga um ponto sorteado a um dos seus vizinhos mais próximos.
+
+        O 2-opt cria a aresta entre os dois invertendo o trecho entre eles (a partir do
+        seguinte ou até o anterior de cada um); o Or-opt leva o trecho que começa no ponto
+        para logo antes ou depois do vizinho. Quando o vizinho cai dentro do próprio
+        trecho, vale um movimento de posições quaisquer.
+        """
+        n = len(rota)
+        tipo, u1, u2, u3, u4 = sorteio
+        posicao = self._posicao
+        i = int(u1 * n)
+        candidatos = self._candidatos[rota[i]]
+        u2 *= 2 * len(candidatos)
+        vizinho, depois = candidatos[int(u2) >> 1], int(u2) & 1
+        # A origem (índice 0) fica nas duas pontas da rota: posição -1 ou n
+        j = posicao[vizinho]
+        if vizinho == 0 and not depois:
+            j = n
+        if tipo < self.configuracoes.proporcao_2opt:
+            if depois:
+                inicio, fim = (i + 1, j) if i < j else (j + 1, i)
+            else:
+                inicio, fim = (i, j - 1) if i < j else (j, i - 1)
+            return delta_2opt(rota, self._d, inicio, fim), (aplicar_2opt, rota, inicio, fim)
+        tamanho = min(1 + int(u3 * 3), n - i)
+        k = j + depois
+        if i <= k <= i + tamanho:
+            return self._sortear_movimento_qualquer(rota, sorteio)
+        invertido = tamanho > 1 and u4 < 0.5
+        return delta_or_opt(rota, self._d, i, tamanho, k, invertido), (aplicar_or_opt, rota, i, tamanho, k, invertido)
+
+    def _sortear_movimento_qualquer(self, rota: List[int], sorteio: List[float]):
+        """Movimento entre posições sorteadas uniformemente em toda a rota"""
+        n = len(rota)
+        tipo, u1, u2, u3, u4 = sorteio
+        if tipo < self.configuracoes.proporcao_2opt or n < 3:
+            i, j = int(u1 * n), int(u2 * (n - 1))
+            j += j >= i
+            if i > j:
+                i, j = j, i
+            return delta_2opt(rota, self._d, i, j), (aplicar_2opt, rota, i, j)
+        tamanho = 1 + int(u3 * 3) if n > 4 else 1
+        i = int(u1 * (n - tamanho + 1))
+        # As posições válidas da aresta de destino são as n - tamanho fora do trecho
+        k = int(u2 * (n - tamanho))
+        if k >= i:
+            k += tamanho + 1
+        invertido = tamanho > 1 and u4 < 0.5
+        return delta_or_opt(rota, self._d, i, tamanho, k, invertido), (aplicar_or_opt, rota, i, tamanho, k, invertido)
+
+    def amostrar_pioras(self, rota: List[int], amostras: int = 500) -> List[int]:
+        """Variações positivas de custo de movimentos sorteados (ao menos uma, igual a 1)"""
+        pioras = []
+        for sorteio in self.rng.random((amostras, 5)).tolist():
+            delta, _ = self.sortear_movimento(rota, sorteio)
+            if delta > 0:
+                pioras.append(delta)
+        return pioras or [1]
+
+    def estimar_temperatura(self, rota: List[int], amostras: int = 500) -> float:
+        """Temperatura em que os movimentos que pioram seriam aceitos com a taxa inicial desejada"""
+        return temperatura_para_taxa(self.amostrar_pioras(rota, amostras), self.configuracoes.taxa_aceitacao_inicial)
+
+    def _indexar(self, rota: List[int], inicio: int, fim: int) -> None:
+        """Atualiza a posição na rota dos pontos em [inicio, fim); a da origem é -1"""
+        posicao = self._posicao
+        for k in range(inicio, fim):
+            posicao[rota[k]] = k
+        posicao[0] = -1
+
+    def rota_inicial(self, tabela: TabelaDistancias) -> List[int]:
+        if self.configuracoes.rota_inicial == 'aleatoria':
+            return (self.rng.permutation(len(tabela.rotulos)) + 1).tolist()
+        if self.configuracoes.rota_inicial == 'vizinho':
+            return list(rota_mais_proxima_indices(tabela.matriz))
+        if self.configuracoes.rota_inicial == 'hilbert':
+            return rota_curva_hilbert(tabela.coordenadas)
+        raise ValueError(f"Rota inicial desconhecida: {self.configuracoes.rota_inicial}")
+
+    def recozer(self, rota: List[int], tabela: TabelaDistancias) -> Tuple[List[int], int, List[int]]:
+        """Evolui a rota até esgotar os passos ou o tempo; devolve a melhor rota, o seu
+        custo e o melhor custo ao fim de cada nível de temperatura"""
+        configuracoes = self.configuracoes
+        self._d = tabela.matriz.tolist()
+        self._candidatos = None
+        if configuracoes.vizinhos_movimentos:
+            self._candidatos = tabela.vizinhos(configuracoes.vizinhos_movimentos).tolist()
+        self._posicao = [0] * (len(rota) + 1)
+        self._indexar(rota, 0, len(rota))
+        custo = tabela.custo(rota)
+        melhor, melhor_custo = rota.copy(), custo
+        historico: List[int] = []
+        if len(rota) < 2:
+            return melhor, melhor_custo, historico
+
+        taxa_inicial = configuracoes.taxa_aceitacao_inicial
+        taxa_final = configuracoes.taxa_aceitacao_final
+        # As temperaturas inicial e final aceitam as pioras de uma amostra de movimentos com
+        # as taxas pedidas; a final fica na escala das menores pioras, e não da média
+        amostra = self.amostrar_pioras(rota)
+        temperatura_inicial = configuracoes.temperatura_inicial or temperatura_para_taxa(amostra, taxa_inicial)
+        temperatura_final = min(temperatura_para_taxa(amostra, taxa_final), temperatura_inicial)
+        # O resfriamento é feito por trechos, do progresso (e da temperatura ou taxa alvo)
+        # em que o trecho começou até o fim do orçamento; cada reaquecimento abre um trecho
+        progresso_trecho, temperatura_trecho, taxa_trecho = 0.0, temperatura_inicial, taxa_inicial
+        temperatura = temperatura_inicial
+        tempo_limite = configuracoes.tempo_limite_ms
+        inicio = time.perf_counter()
+        por_nivel = configuracoes.passos_por_temperatura or max(1000, 20 * len(rota))
+        niveis_congelados = 0
+        self.passos = 0
+        self.reaquecimentos = 0
+
+        while self.passos < configuracoes.numero_passos:
+            decorrido = time.perf_counter() - inicio
+            if tempo_limite is not None and decorrido * 1000 >= tempo_limite:
+                break
+            passos = min(por_nivel, configuracoes.numero_passos - self.passos)
+            pioras: List[int] = []
+            desceu = False
+            for sorteio in self.rng.random((passos, 6)).tolist():
+                delta, movimento = self.sortear_movimento(rota, sorteio[:5])
+                if delta > 0 and len(pioras) < AMOSTRA_PIORAS:
+                    pioras.append(delta)
+                if delta <= 0 or sorteio[5] < math.exp(-delta / temperatura):
+                    self._indexar(rota, *movimento[0](*movimento[1:]))
+                    custo += delta
+                    desceu = desceu or delta < 0
+                    if custo < melhor_custo:
+                        melhor, melhor_custo = rota.copy(), custo
+            self.passos += passos
+            historico.append(melhor_custo)
+
+            # Progresso no orçamento (passos ou tempo, o que estiver mais adiantado) e no trecho
+            progresso = self.passos / configuracoes.numero_passos
+            if tempo_limite is not None:
+                progresso = max(progresso, (time.perf_counter() - inicio) * 1000 / tempo_limite)
+            fracao = min(1.0, (progresso - progresso_trecho) / (1.0 - progresso_trecho)) if progresso_trecho < 1.0 else 1.0
+            if configuracoes.resfriamento == 'geometrico':
+                # T(t) = T0 (Tf / T0)^t: chega à temperatura final junto com o orçamento
+                temperatura = temperatura_trecho * (temperatura_final / temperatura_trecho) ** fracao
+            elif configuracoes.resfriamento == 'adaptativo':
+                # A taxa alvo de aceitação de pioras cai exponencialmente até a final, e a
+                # temperatura é a que aceita as pioras sorteadas no último nível com essa taxa
+                alvo = taxa_trecho * (taxa_final / taxa_trecho) ** fracao
+                if pioras:
+                    temperatura = temperatura_para_taxa(pioras, alvo)
+            else:
+                raise ValueError(f"Resfriamento desconhecido: {configuracoes.resfriamento}")
+            temperatura = max(temperatura, TEMPERATURA_MINIMA)
+
+            # Congelada (nenhum movimento de descida aceito por vários níveis), a busca
+            # recomeça da melhor rota com parte da temperatura inicial e volta a esfriar
+            # no que sobra do orçamento
+            niveis_congelados = 0 if desceu else niveis_congelados + 1
+            paciencia = configuracoes.paciencia_reaquecimento
+            if paciencia is not None and niveis_congelados >= paciencia and progresso < 1.0:
+                rota[:] = melhor
+                self._indexar(rota, 0, len(rota))
+                custo = melhor_custo
+                progresso_trecho = progresso
+                temperatura = temperatura_trecho = temperatura_inicial * configuracoes.fator_reaquecimento
+                taxa_trecho = max(taxa_aceitacao(amostra, temperatura_trecho), taxa_final)
+                niveis_congelados = 0
+                self.reaquecimentos += 1
+
+        return melhor, melhor_custo, historico
+
+    def executar(self, matriz_txt: str) -> Tuple[List[str], Tuple[int, int], Dict[str, Tuple[int, int]], List[List[str]], List[int]]:
+        matriz, inicio, pontos_entregas = FlyFoodAG.ler_matriz_texto(matriz_txt)
+        tabela = construir_tabela(inicio, pontos_entregas)
+        melhor, _, historico = self.recozer(self.rota_inicial(tabela), tabela)
+        return tabela.para_rotulos(melhor), inicio, pontos_entregas, matriz, historico
+
+
+def comparar_com_ag(matriz_txt: str, tempo_limite_ms: int, semente: Optional[int] = None) -> Dict[str, Tuple[int, float]]:
+    """Roda o recozimento e o AG com o mesmo prazo e o mesmo ponto de partida (a rota do
+    vizinho mais próximo, única semente do AG); devolve, para cada um, o custo da melhor
+    rota e as rotas avaliadas por segundo de CPU"""
+    resultados = {}
+    _, inicio, pontos_entregas = FlyFoodAG.ler_matriz_texto(matriz_txt)
+    tabela = construir_tabela(inicio, pontos_entregas)
+
+    rs = FlyFoodRS(ConfiguracoesRS(tempo_limite_ms=tempo_limite_ms, numero_passos=10 ** 12, rota_inicial='vizinho', semente=semente))
+    cpu = time.process_time()
+    rota, _, _, _, _ = rs.executar(matriz_txt)
+    cpu = time.process_time() - cpu
+    resultados['recozimento'] = (tabela.custo(tabela.para_indices(rota)), rs.passos / max(cpu, 1e-9))
+
+    configuracoes = ConfiguracoesAG(numero_geracoes=10 ** 9, tempo_limite_ms=tempo_limite_ms, semente=semente)
+    configuracoes.fracao_sementes = 1 / configuracoes.tamanho_populacao
+    ag = FlyFoodAG(configuracoes)
+    cpu = time.process_time()
+    rota, _, _, _, historico = ag.executar(matriz_txt)
+    cpu = time.process_time() - cpu
+    avaliacoes = configuracoes.tamanho_populacao * (len(historico) + 1)
+    resultados['genetico'] = (tabela.custo(tabela.para_indices(rota)), avaliacoes / max(cpu, 1e-9))
+    return resultados
+
+
+if __name__ == "__main__":
+    print("Cole sua matriz: ")
+
+    linhas = []
+    while True:
+        try:
+            linha = input()
+            if linha.strip() == '':
+                break
+            linhas.append(linha)
+        except EOFError:
+            break
+
+    for metodo, (custo, vazao) in comparar_com_ag('\n'.join(linhas), tempo_limite_ms=2000).items():
+        print(f"{metodo}: custo {custo} | {vazao:,.0f} rotas avaliadas por segundo de CPU")
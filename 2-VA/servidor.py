@@ -0,0 +1,370 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Deque, Dict, List, Optional, Tuple
+
+import lote
+from modelo_custo import ModeloCusto, carregar_modelo
+
+# Servidor local (HTTP em 127.0.0.1 ou num socket Unix) para respostas rápidas: os
+# processos que resolvem as rotas são criados uma vez, já com os solvers importados e o
+# modelo de custo carregado, e ficam esperando pedidos. Rotas:
+#
+#   POST /resolver      corpo como uma linha do modo em lote (lote.py), mais "prazo_ms";
+#                       "motor" escolhe um solver fixo (ag, forca_bruta, vizinho_mais_proximo...)
+#   POST /cancelar      {"id": ...}: cancela um pedido em andamento com esse id
+#   GET  /estatisticas  fila, processos ocupados, contadores e latências
+#
+# O prazo de um pedido conta desde a chegada: o tempo que sobra quando ele sai da fila
+# vira o orçamento do despachante. Um pedido cujo prazo acaba, que é cancelado ou cujo
+# cliente desconecta sai da fila ou, se já estiver rodando, tem o processo encerrado e
+# substituído por outro.
+
+# Parte do prazo reservada para a troca de mensagens com o processo e a resposta
+MARGEM_MS = 5
+TAMANHO_MAXIMO_CORPO = 64 * 1024 * 1024
+# Latências guardadas para os percentis das estatísticas
+AMOSTRAS_LATENCIA = 1000
+
+
+class PedidoCancelado(Exception):
+    """O pedido foi cancelado por /cancelar antes de terminar"""
+
+
+def _laco_trabalhador(conexao, modelo: ModeloCusto, tempo_limite_ms: Optional[int]) -> None:
+    """Corpo de cada processo: resolve os registros recebidos até a conexão fechar"""
+    # Ctrl+C chega ao grupo todo; quem encerra os processos é o servidor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    lote._inicializar_processo(modelo, tempo_limite_ms, 'auto')
+    while True:
+        try:
+            tarefa = conexao.recv()
+        except (EOFError, OSError):
+            return
+        conexao.send(lote.resolver_registro(tarefa))
+
+
+@dataclass
+class Pedido:
+    numero: int
+    registro: dict
+    chegada: float
+    prazo: Optional[float]  # instante limite em time.perf_counter(), ou None
+    resultado: asyncio.Future
+    saida_fila: Optional[float] = None
+
+
+class _Trabalhador:
+    """Um processo resolvedor e a ponta do servidor no seu pipe"""
+
+    def __init__(self, contexto, modelo: ModeloCusto, tempo_limite_ms: Optional[int]):
+        self.conexao, filho = contexto.Pipe()
+        self.processo = contexto.Process(target=_laco_trabalhador, args=(filho, modelo, tempo_limite_ms), daemon=True)
+        self.processo.start()
+        filho.close()
+        self.pedido: Optional[Pedido] = None
+
+
+def _percentis(amostras: Deque[float]) -> Dict[str, float]:
+    if not amostras:
+        return {}
+    ordenadas = sorted(amostras)
+    return {nome: round(ordenadas[min(len(ordenadas) - 1, int(p * len(ordenadas)))], 3)
+            for nome, p in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))}
+
+
+class ServidorFlyFood:
+    """Pool de processos resolvedores sempre prontos, com fila, prazos e cancelamento.
+
+    `prazo_padrao_ms` vale para os pedidos sem "prazo_ms" (None: sem prazo; o
+    despachante usa então o orçamento padrão do modelo de custo).
+    """
+
+    def __init__(self, processos: Optional[int] = None, prazo_padrao_ms: Optional[float] = None, modelo: Optional[ModeloCusto] = None):
+        self.processos = processos or multiprocessing.cpu_count()
+        self.prazo_padrao_ms = prazo_padrao_ms
+        self.modelo = modelo
+        # Os processos saem de um forkserver que já importou os solvers: nascem prontos e,
+        # ao contrário de um fork direto do servidor, sem herdar os sockets dos clientes
+        # (que ficariam abertos enquanto o processo vivesse). Onde não há forkserver, spawn.
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            self._contexto = multiprocessing.get_context('forkserver')
+            self._contexto.set_forkserver_preload(['lote'])
+        else:
+            self._contexto = multiprocessing.get_context('spawn')
+        self._trabalhadores: List[_Trabalhador] = []
+        self._fila: Deque[Pedido] = deque()
+        self._por_id: Dict[str, Pedido] = {}
+        self._numeros = itertools.count()
+        self._latencias: Deque[float] = deque(maxlen=AMOSTRAS_LATENCIA)
+        self._esperas: Deque[float] = deque(maxlen=AMOSTRAS_LATENCIA)
+        self.contadores = dict(recebidos=0, concluidos=0, erros=0, prazos_esgotados=0, cancelados=0, processos_reiniciados=0)
+
+    async def iniciar(self) -> None:
+        # Calibrado (se ainda não houver modelo gravado) antes de aceitar pedidos, para
+        # que o micro-benchmark não consuma o prazo do primeiro deles
+        self.modelo = self.modelo or carregar_modelo(calibrar_se_ausente=True)
+        for _ in range(self.processos):
+            self._adicionar_trabalhador()
+
+    async def encerrar(self) -> None:
+        loop = asyncio.get_running_loop()
+        for pedido in list(self._fila):
+            pedido.resultado.cancel()
+        self._fila.clear()
+        for trabalhador in self._trabalhadores:
+            loop.remove_reader(trabalhador.conexao.fileno())
+            if trabalhador.pedido is not None:
+                trabalhador.pedido.resultado.cancel()
+            # Sem a conexão o processo sai do laço sozinho; se estiver resolvendo, é encerrado
+            trabalhador.conexao.close()
+            if trabalhador.pedido is not None:
+                trabalhador.processo.terminate()
+        for trabalhador in self._trabalhadores:
+            await loop.run_in_executor(None, trabalhador.processo.join, 1)
+            if trabalhador.processo.is_alive():
+                trabalhador.processo.kill()
+        self._trabalhadores.clear()
+
+    def _adicionar_trabalhador(self) -> None:
+        trabalhador = _Trabalhador(self._contexto, self.modelo, None)
+        self._trabalhadores.append(trabalhador)
+        asyncio.get_running_loop().add_reader(trabalhador.conexao.fileno(), self._resultado_pronto, trabalhador)
+
+    def _substituir_trabalhador(self, trabalhador: _Trabalhador) -> None:
+        asyncio.get_running_loop().remove_reader(trabalhador.conexao.fileno())
+        self._trabalhadores.remove(trabalhador)
+        trabalhador.processo.terminate()
+        trabalhador.conexao.close()
+        self.contadores['processos_reiniciados'] += 1
+        self._adicionar_trabalhador()
+
+    def _resultado_pronto(self, trabalhador: _Trabalhador) -> None:
+        pedido, trabalhador.pedido = trabalhador.pedido, None
+        try:
+            resultado = trabalhador.conexao.recv()
+        except (EOFError, OSError):
+            # O processo morreu no meio do pedido
+            self._substituir_trabalhador(trabalhador)
+            if pedido is not None and not pedido.resultado.done():
+                pedido.resultado.set_exception(RuntimeError("O processo resolvedor terminou inesperadamente"))
+            self._despachar()
+            return
+        if pedido is not None and not pedido.resultado.done():
+            pedido.resultado.set_result(resultado)
+        self._despachar()
+
+    def _despachar(self) -> None:
+        livres = [trabalhador for trabalhador in self._trabalhadores if trabalhador.pedido is None]
+        while self._fila and livres:
+            pedido = self._fila.popleft()
+            if pedido.resultado.done():
+                continue
+            pedido.saida_fila = time.perf_counter()
+            registro = pedido.registro
+            if pedido.prazo is not None:
+                restante_ms = (pedido.prazo - pedido.saida_fila) * 1000 - MARGEM_MS
+                if restante_ms <= 0:
+                    pedido.resultado.set_exception(TimeoutError("Prazo esgotado na fila"))
+                    continue
+                registro = dict(registro, tempo_limite_ms=int(min(registro.get('tempo_limite_ms', restante_ms), restante_ms)))
+            trabalhador = livres.pop()
+            trabalhador.pedido = pedido
+            trabalhador.conexao.send((pedido.numero, json.dumps(registro)))
+
+    def _descartar(self, pedido: Pedido) -> None:
+        # Tira o pedido da fila ou, se já estiver rodando, encerra o processo que o resolve
+        if not pedido.resultado.done():
+            pedido.resultado.cancel()
+        try:
+            self._fila.remove(pedido)
+        except ValueError:
+            pass
+        for trabalhador in self._trabalhadores:
+            if trabalhador.pedido is pedido:
+                self._substituir_trabalhador(trabalhador)
+                self._despachar()
+                break
+
+    async def resolver(self, registro: dict, prazo_ms: Optional[float] = None) -> dict:
+        """Resolve um registro no formato do modo em lote e devolve o resultado dele,
+        com 'fila_ms' e 'latencia_ms'.
+
+        Lança TimeoutError se o prazo acabar e PedidoCancelado se o pedido for cancelado
+        por id; se a própria tarefa for cancelada, o pedido também é.
+        """
+        agora = time.perf_counter()
+        registro = dict(registro)
+        prazo_ms = registro.pop('prazo_ms', prazo_ms if prazo_ms is not None else self.prazo_padrao_ms)
+        pedido = Pedido(next(self._numeros), registro, agora, None if prazo_ms is None else agora + prazo_ms / 1000,
+                        asyncio.get_running_loop().create_future())
+        identificador = registro.get('id')
+        if identificador is not None:
+            self._por_id[str(identificador)] = pedido
+        self.contadores['recebidos'] += 1
+        self._fila.append(pedido)
+        self._despachar()
+        try:
+            restante = None if pedido.prazo is None else max(0.0, pedido.prazo - time.perf_counter())
+            resultado = await asyncio.wait_for(asyncio.shield(pedido.resultado), restante)
+        except (asyncio.TimeoutError, TimeoutError):
+            self.contadores['prazos_esgotados'] += 1
+            self._descartar(pedido)
+            raise TimeoutError("Prazo esgotado") from None
+        except (asyncio.CancelledError, PedidoCancelado):
+            self.contadores['cancelados'] += 1
+            self._descartar(pedido)
+            raise
+        except Exception:
+            self.contadores['erros'] += 1
+            raise
+        finally:
+            if identificador is not None and self._por_id.get(str(identificador)) is pedido:
+                del self._por_id[str(identificador)]
+
+        fim = time.perf_counter()
+        resultado.pop('indice', None)
+        resultado['fila_ms'] = round((pedido.saida_fila - pedido.chegada) * 1000, 3)
+        resultado['latencia_ms'] = round((fim - pedido.chegada) * 1000, 3)
+        self._esperas.append(resultado['fila_ms'])
+        self._latencias.append(resultado['latencia_ms'])
+        self.contadores['erros' if 'erro' in resultado else 'concluidos'] += 1
+        return resultado
+
+    def cancelar(self, identificador) -> bool:
+        """Cancela o pedido em andamento com esse id; False se não houver nenhum"""
+        pedido = self._por_id.get(str(identificador))
+        if pedido is None or pedido.resultado.done():
+            return False
+        pedido.resultado.set_exception(PedidoCancelado(f"Pedido {identificador} cancelado"))
+        return True
+
+    def estatisticas(self) -> dict:
+        return dict(
+            processos=len(self._trabalhadores),
+            ocupados=sum(trabalhador.pedido is not None for trabalhador in self._trabalhadores),
+            fila=len(self._fila),
+            **self.contadores,
+            fila_ms=_percentis(self._esperas),
+            latencia_ms=_percentis(self._latencias),
+        )
+
+    async def _responder_resolver(self, corpo: bytes, leitor: asyncio.StreamReader) -> Optional[Tuple[int, dict]]:
+        registro = json.loads(corpo)
+        if not isinstance(registro, dict):
+            raise ValueError("O corpo deve ser um objeto JSON")
+        tarefa = asyncio.ensure_future(self.resolver(registro))
+        # Fim da conexão antes da resposta é um cancelamento
+        desconexao = asyncio.ensure_future(leitor.read(1))
+        try:
+            while not tarefa.done():
+                await asyncio.wait({tarefa, desconexao}, return_when=asyncio.FIRST_COMPLETED)
+                if desconexao.done() and not tarefa.done():
+                    if not desconexao.result():
+                        tarefa.cancel()
+                        await asyncio.gather(tarefa, return_exceptions=True)
+                        return None
+                    # Bytes a mais depois do pedido: continua esperando só pela resposta
+                    await asyncio.wait({tarefa})
+        finally:
+            desconexao.cancel()
+        try:
+            resultado = tarefa.result()
+        except TimeoutError as erro:
+            return HTTPStatus.GATEWAY_TIMEOUT, {'id': registro.get('id'), 'erro': str(erro)}
+        except PedidoCancelado as erro:
+            return HTTPStatus.CONFLICT, {'id': registro.get('id'), 'erro': str(erro)}
+        if 'erro' in resultado:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, resultado
+        return HTTPStatus.OK, resultado
+
+    async def atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Atende uma conexão HTTP/1.1 com um único pedido (Connection: close)"""
+        try:
+            try:
+                cabecalho = await leitor.readuntil(b'\r\n\r\n')
+                linha, *campos = cabecalho.decode('latin-1').split('\r\n')
+                metodo, caminho, _ = linha.split(' ', 2)
+                cabecalhos = {nome.strip().lower(): valor.strip() for nome, valor in (campo.split(':', 1) for campo in campos if ':' in campo)}
+                tamanho = int(cabecalhos.get('content-length', 0))
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                return
+            if tamanho > TAMANHO_MAXIMO_CORPO:
+                resposta = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'erro': "Corpo grande demais"}
+            else:
+                corpo = await leitor.readexactly(tamanho) if tamanho else b''
+                resposta = await self._rotear(metodo, caminho.split('?', 1)[0], corpo, leitor)
+            if resposta is None:
+                return
+            status, dados = resposta
+            conteudo = json.dumps(dados, ensure_ascii=False).encode()
+            escritor.write(f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                           f"Content-Length: {len(conteudo)}\r\nConnection: close\r\n\r\n".encode() + conteudo)
+            await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _rotear(self, metodo: str, caminho: str, corpo: bytes, leitor: asyncio.StreamReader) -> Optional[Tuple[int, dict]]:
+        try:
+            if caminho == '/resolver' and metodo == 'POST':
+                return await self._responder_resolver(corpo, leitor)
+            if caminho == '/cancelar' and metodo == 'POST':
+                cancelado = self.cancelar(json.loads(corpo).get('id'))
+                return (HTTPStatus.OK if cancelado else HTTPStatus.NOT_FOUND), {'cancelado': cancelado}
+            if caminho == '/estatisticas' and metodo == 'GET':
+                return HTTPStatus.OK, self.estatisticas()
+        except (ValueError, AttributeError) as erro:
+            return HTTPStatus.BAD_REQUEST, {'erro': f"{type(erro).__name__}: {erro}"}
+        except RuntimeError as erro:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'erro': str(erro)}
+        return HTTPStatus.NOT_FOUND, {'erro': f"Rota desconhecida: {metodo} {caminho}"}
+
+
+async def servir(servidor: ServidorFlyFood, host: str = '127.0.0.1', porta: int = 8765, caminho_socket: Optional[str] = None) -> None:
+    await servidor.iniciar()
+    try:
+        if caminho_socket:
+            escuta = await asyncio.start_unix_server(servidor.atender, path=caminho_socket)
+            endereco = caminho_socket
+        else:
+            escuta = await asyncio.start_server(servidor.atender, host, porta)
+            endereco = f"http://{host}:{porta}"
+        print(f"FlyFood servindo em {endereco} com {servidor.processos} processos", file=sys.stderr)
+        async with escuta:
+            await escuta.serve_forever()
+    finally:
+        await servidor.encerrar()
+        if caminho_socket and os.path.exists(caminho_socket):
+            os.unlink(caminho_socket)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FlyFood: servidor local de rotas com processos sempre prontos")
+    parser.add_argument('--host', default='127.0.0.1', help="endereço HTTP (só local, por padrão)")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--socket', default=None, help="caminho de um socket Unix, no lugar do HTTP em host:porta")
+    parser.add_argument('--processos', type=int, default=None, help="processos resolvedores (padrão: todos os núcleos)")
+    parser.add_argument('--prazo-ms', type=float, default=None, help="prazo dos pedidos que não trazem 'prazo_ms'")
+    parser.add_argument('--calibrar', action='store_true', help="refaz o micro-benchmark do modelo de custo antes de servir")
+    argumentos = parser.parse_args()
+    modelo = carregar_modelo(recalibrar=True) if argumentos.calibrar else None
+    servidor = ServidorFlyFood(argumentos.processos, argumentos.prazo_ms, modelo)
+    try:
+        asyncio.run(servir(servidor, argumentos.host, argumentos.porta, argumentos.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Gráficos das rotas e da evolução do AG. Fica fora dos módulos de resolução para que
+# o matplotlib só seja carregado (e só precise de backend) quando algo é desenhado.
+
+_plt = None
+
+
+def _pyplot():
+    """Importa o pyplot na primeira chamada, com o backend não interativo Agg.
+
+    Quem quiser janelas pode escolher outro backend pela variável MPLBACKEND.
+    """
+    global _plt
+    if _plt is None:
+        import matplotlib
+        if not os.environ.get('MPLBACKEND'):
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+def _finalizar(plt, salvar_em: Optional[str], padrao: str) -> Optional[str]:
+    # Com backend interativo e sem arquivo, mostra a janela; senão grava a imagem
+    if not salvar_em and plt.get_backend().lower() != 'agg':
+        plt.show()
+        plt.close()
+        return None
+    caminho = salvar_em or padrao
+    plt.savefig(caminho)
+    plt.close()
+    return caminho
+
+
+def plotar_rota(rota: List[str], inicio: Tuple[int, int], pontos: Dict[str, Tuple[int, int]], matriz: List[List[str]], titulo: str = 'Rota', salvar_em: Optional[str] = None) -> Optional[str]:
+    """Desenha a rota sobre a grade; devolve o arquivo gravado, se houver"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 8))
+    plt.title(titulo)
+
+    for r, linha in enumerate(matriz):
+        for c, valor in enumerate(linha):
+            plt.scatter(c, -r, color='lightgray')
+            if valor != '0':
+                plt.text(c, -r, valor, fontsize=8, ha='center', va='center')
+
+    if pontos:
+        xs = [coord[1] for coord in pontos.values()]
+        ys = [-coord[0] for coord in pontos.values()]
+        plt.scatter(xs, ys, c='orange', s=60, marker='o', label='Entregas')
+
+    caminho = [inicio] + [pontos[p] for p in rota] + [inicio]
+    for i in range(len(caminho) - 1):
+        p0 = caminho[i]
+        p1 = caminho[i + 1]
+        x0, y0 = p0[1], -p0[0]
+        x1, y1 = p1[1], -p1[0]
+        inter_x, inter_y = x1, y0
+        plt.plot([x0, inter_x], [y0, inter_y], 'b-')
+        plt.plot([inter_x, x1], [inter_y, y1], 'b-')
+        dist = abs(p0[0] - p1[0]) + abs(p0[1] - p1[1])
+        xm = (x0 + inter_x + x1) / 3
+        ym = (y0 + inter_y + y1) / 3
+        plt.text(xm, ym, f"{dist}", color='purple', fontsize=8, ha='center', va='center', bbox=dict(facecolor='white', alpha=0.6, edgecolor='none', boxstyle='round,pad=0.2'))
+
+    plt.scatter(inicio[1], -inicio[0], c='red', label='Início (R)')
+    plt.legend()
+    plt.grid(True)
+    plt.axis('equal')
+    return _finalizar(plt, salvar_em, 'rota.png')
+
+
+def plotar_evolucao(distancias: List[int], salvar_em: Optional[str] = None) -> Optional[str]:
+    """Curva da melhor distância por geração; devolve o arquivo gravado, se houver"""
+    plt = _pyplot()
+    plt.figure(figsize=(10, 4))
+    plt.plot(distancias, label='Melhor distância')
+    plt.title("Evolução da distância por geração")
+    plt.xlabel("Geração")
+    plt.ylabel("Distância")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    return _finalizar(plt, salvar_em, 'evolucao.png')
@@ -1,17 +1,17 @@
-def ler_matriz_input():
-    # Lê as dimensões da matriz
-    linhas, colunas = map(int, input().strip().split())
+import numpy as np
+
+from distancias import INFINITO
+from entrada import MatrizEsparsa, ler_entrada
+from indice_espacial import GradeEspacial
 
-    # Lê as linhas da matriz
-    matriz = []
-    for _ in range(linhas):
-        linha = input().strip().split()
-        matriz.append(linha)
-    
-    return matriz
+def ler_matriz_input():
+    # Aceita a matriz densa ou o formato esparso (rótulo linha coluna)
+    return ler_entrada()
 
 def encontrar_pontos(matriz):
     # Encontra os pontos não nulos e armazena suas coordenadas
+    if isinstance(matriz, MatrizEsparsa):
+        return dict(matriz.pontos)
     posicoes = {}
     for i, linha in enumerate(matriz):
         for j, valor in enumerate(linha):
@@ -22,26 +22,53 @@ def encontrar_pontos(matriz):
 def distancia_manhattan(p1, p2):
     return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
 
-def encontrar_rota_mais_proxima(posicoes, ponto_origem):
-    pontos_entrega = {nome: coord for nome, coord in posicoes.items() if nome != 'R'}
+def rota_mais_proxima_indices(matriz, rng=None, candidatos=1, primeiro=None):
+    # Vizinho mais próximo sobre a matriz de distâncias, com a origem no índice 0.
+    # Com candidatos > 1 (e um rng), cada passo sorteia entre os `candidatos` pontos
+    # restantes mais próximos; `primeiro` fixa a primeira entrega da rota.
+    restantes = np.ones(len(matriz), dtype=bool)
+    restantes[0] = False
     rota = []
-    posicao_atual = ponto_origem
-
-    while pontos_entrega:
-        ponto_mais_proximo = None
-        menor_distancia = float('inf')
+    atual = 0
+    if primeiro is not None:
+        restantes[primeiro] = False
+        rota.append(primeiro)
+        atual = primeiro
 
-        for nome_ponto, coordenada in pontos_entrega.items():
-            dist = distancia_manhattan(posicao_atual, coordenada)
-            if dist < menor_distancia:
-                menor_distancia = dist
-                ponto_mais_proximo = nome_ponto
+    while len(rota) < len(matriz) - 1:
+        distancias = np.where(restantes, matriz[atual], INFINITO)
+        k = min(candidatos, len(matriz) - 1 - len(rota))
+        if k > 1 and rng is not None:
+            atual = int(rng.choice(np.argpartition(distancias, k - 1)[:k]))
+        else:
+            # A origem nunca é candidata; argmin desempata pelo primeiro índice,
+            # ou seja, pela ordem dos pontos no dicionário
+            atual = int(distancias.argmin())
+        restantes[atual] = False
+        rota.append(atual)
 
-        rota.append(ponto_mais_proximo)
-        posicao_atual = pontos_entrega.pop(ponto_mais_proximo)
+    return rota
 
+def rota_mais_proxima_coordenadas(coordenadas):
+    # Mesma rota de rota_mais_proxima_indices (inclusive nos empates, que ficam com o
+    # menor índice), mas sem a matriz n x n: cada passo consulta uma grade espacial da
+    # qual os pontos visitados são removidos. A origem é a linha 0 de `coordenadas`.
+    coordenadas = np.asarray(coordenadas, dtype=np.int64).reshape(-1, 2).tolist()
+    grade = GradeEspacial(coordenadas[1:], list(range(1, len(coordenadas))))
+    rota = []
+    linha, coluna = coordenadas[0]
+    while len(grade):
+        atual = grade.mais_proximo(linha, coluna)
+        grade.remover(atual)
+        rota.append(atual)
+        linha, coluna = coordenadas[atual]
     return rota
 
+def encontrar_rota_mais_proxima(posicoes, ponto_origem):
+    rotulos = [p for p in posicoes if p != 'R']
+    coordenadas = [ponto_origem] + [posicoes[p] for p in rotulos]
+    return [rotulos[i - 1] for i in rota_mais_proxima_coordenadas(coordenadas)]
+
 def main():
     matriz = ler_matriz_input()
     posicoes = encontrar_pontos(matriz)